@@ -4,8 +4,13 @@ URL to HTML Converter API Client
 A simple, easy-to-use client for the URL to HTML Converter API.
 """
 
-from .python_client import URLToHTMLClient, BatchRequest, BatchResponse
+from .python_client import (
+    URLToHTMLClient,
+    AsyncURLToHTMLClient,
+    BatchRequest,
+    BatchResponse,
+)
 
 __version__ = "1.0.0"
-__all__ = ["URLToHTMLClient", "BatchRequest", "BatchResponse"]
+__all__ = ["URLToHTMLClient", "AsyncURLToHTMLClient", "BatchRequest", "BatchResponse"]
 
@@ -8,6 +8,8 @@ This example demonstrates:
 - Error handling
 """
 
+import sys
+
 from client import URLToHTMLClient
 
 def main():
@@ -39,16 +41,17 @@ def main():
         for method, count in response.summary.by_method.items():
             print(f"  {method}: {count}")
         
-        # Print individual results
-        print(f"\nIndividual Results:")
+        # Print individual results (built up and written in one call)
+        lines = [f"\nIndividual Results:"]
         for result in response.results:
             if result.is_success:
-                print(f"  ✓ {result.url}")
-                print(f"    Method: {result.method}")
-                print(f"    Size: {len(result.html)} bytes")
+                lines.append(f"  ✓ {result.url}")
+                lines.append(f"    Method: {result.method}")
+                lines.append(f"    Size: {len(result.html)} bytes")
             else:
-                print(f"  ✗ {result.url}")
-                print(f"    Error: {result.error}")
+                lines.append(f"  ✗ {result.url}")
+                lines.append(f"    Error: {result.error}")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Get successful results
         successful = response.get_successful()
@@ -6,9 +6,16 @@ This example shows how to:
 - Configure for maximum parallelism
 - Use multiple custom JS rendering services
 - Monitor progress and performance
+- Stream URLs from a file without loading them all into memory
+
+Usage:
+    python example_massive_scaling.py            # 1000 generated URLs
+    python example_massive_scaling.py urls.txt   # one URL per line, streamed
 """
 
 from client import URLToHTMLClient
+from concurrent.futures import ThreadPoolExecutor
+import sys
 import time
 
 def main():
@@ -54,22 +61,27 @@ def main():
     start_time = time.time()
     
     try:
-        # Check API health first
-        health = client.health_check()
-        print(f"API Status: {health['status']}")
-        print(f"API Version: {health['version']}")
-        print()
-        
-        # Fetch batch with massive scaling configuration
+        # Check API health and start the batch concurrently; the two calls are
+        # independent and share the client's pooled session
         print("Starting batch processing...")
-        response = client.fetch_batch(
-            urls,
-            static_xhr_concurrency=200,  # Process 200 URLs in parallel for static/XHR
-            custom_js_service_endpoints=custom_js_services,
-            custom_js_batch_size=20,  # 20 URLs per service batch
-            custom_js_cooldown_seconds=120,  # 2 minute cooldown
-            decodo_enabled=True  # Enable Decodo fallback
-        )
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            health_future = executor.submit(client.health_check)
+            response_future = executor.submit(
+                client.fetch_batch,
+                urls,
+                static_xhr_concurrency=200,  # Process 200 URLs in parallel for static/XHR
+                custom_js_service_endpoints=custom_js_services,
+                custom_js_batch_size=20,  # 20 URLs per service batch
+                custom_js_cooldown_seconds=120,  # 2 minute cooldown
+                decodo_enabled=True  # Enable Decodo fallback
+            )
+            
+            health = health_future.result()
+            print(f"API Status: {health['status']}")
+            print(f"API Version: {health['version']}")
+            print()
+            
+            response = response_future.result()
         
         elapsed_time = time.time() - start_time
         
@@ -95,23 +107,30 @@ def main():
             print(f"  URLs per second: {urls_per_second:.2f}")
             print(f"  Average time per URL: {response.summary.total_time / response.summary.total:.2f}s")
         
+        # Build result listings and write them in one call instead of one
+        # print per line
+        lines = []
+        
         # Show some successful results
         successful = response.get_successful()
         if successful:
-            print(f"\nSample Successful Results (first 5):")
+            lines.append(f"\nSample Successful Results (first 5):")
             for result in successful[:5]:
-                print(f"  ✓ {result.url}")
-                print(f"    Method: {result.method}, Size: {len(result.html)} bytes")
+                lines.append(f"  ✓ {result.url}")
+                lines.append(f"    Method: {result.method}, Size: {len(result.html)} bytes")
         
         # Show failed results
         failed = response.get_failed()
         if failed:
-            print(f"\nFailed Results ({len(failed)}):")
+            lines.append(f"\nFailed Results ({len(failed)}):")
             for result in failed[:10]:  # Show first 10 failures
-                print(f"  ✗ {result.url}")
-                print(f"    Error: {result.error}")
+                lines.append(f"  ✗ {result.url}")
+                lines.append(f"    Error: {result.error}")
             if len(failed) > 10:
-                print(f"  ... and {len(failed) - 10} more failures")
+                lines.append(f"  ... and {len(failed) - 10} more failures")
+        
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
         
     except Exception as e:
         print(f"\nError occurred: {e}")
@@ -121,6 +140,46 @@ def main():
     finally:
         client.close()
 
+def main_streaming(path):
+    """Process a URL file of any size with flat memory usage."""
+    client = URLToHTMLClient(
+        base_url="http://localhost:8000",
+        timeout=7200
+    )
+    
+    start_time = time.time()
+    success = failed = 0
+    failed_lines = []
+    
+    try:
+        with open(path, encoding="utf-8") as f:
+            for result in client.fetch_batch_iter(
+                map(str.strip, f),
+                chunk_size=500,
+                static_xhr_concurrency=200,
+                decodo_enabled=True
+            ):
+                if result.is_success:
+                    success += 1
+                else:
+                    failed += 1
+                    failed_lines.append(f"  ✗ {result.url}: {result.error}")
+                    if len(failed_lines) >= 100:
+                        sys.stdout.write("\n".join(failed_lines) + "\n")
+                        failed_lines.clear()
+        
+        if failed_lines:
+            sys.stdout.write("\n".join(failed_lines) + "\n")
+        
+        print(f"\nProcessed {success + failed} URLs: {success} successful, {failed} failed")
+        print(f"Total Elapsed Time: {time.time() - start_time:.2f}s")
+    
+    finally:
+        client.close()
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        main_streaming(sys.argv[1])
+    else:
+        main()
 
@@ -5,12 +5,87 @@ Simple, easy-to-use client for fetching HTML content from URLs.
 """
 
 import requests
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Tuple
+from dataclasses import dataclass, asdict, field
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import asyncio
+import atexit
+import itertools
 import json
+import sys
+import threading
 
+try:
+    import aiohttp
+except ImportError:
+    # aiohttp not installed, only the sync URLToHTMLClient is available
+    aiohttp = None
 
-@dataclass
+try:
+    import ijson
+except ImportError:
+    # ijson not installed, iter_results falls back to a buffered parse
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson not installed, use the standard library json module
+    orjson = None
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep a __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a request body to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# BatchRequest fields sent in the "config" block (everything except urls)
+_CONFIG_FIELDS = (
+    "static_xhr_concurrency",
+    "static_xhr_timeout",
+    "custom_js_service_endpoints",
+    "custom_js_batch_size",
+    "custom_js_cooldown_seconds",
+    "custom_js_timeout",
+    "decodo_enabled",
+    "decodo_timeout",
+    "min_content_length",
+    "min_text_length",
+    "save_outputs",
+    "enable_logging",
+)
+
+
+@lru_cache(maxsize=128)
+def _config_json(config_items: tuple) -> bytes:
+    """Serialize a frozen config block; identical configs are encoded once."""
+    return _dumps({
+        field: list(value) if isinstance(value, tuple) else value
+        for field, value in config_items
+    })
+
+
+@dataclass(**_SLOTS)
 class BatchRequest:
     """Request configuration for batch URL fetching."""
     
@@ -32,39 +107,39 @@ class BatchRequest:
         """Convert to API request format."""
         data = {"urls": self.urls}
         
-        config = {}
-        if self.static_xhr_concurrency is not None:
-            config["static_xhr_concurrency"] = self.static_xhr_concurrency
-        if self.static_xhr_timeout is not None:
-            config["static_xhr_timeout"] = self.static_xhr_timeout
-        if self.custom_js_service_endpoints is not None:
-            config["custom_js_service_endpoints"] = self.custom_js_service_endpoints
-        if self.custom_js_batch_size is not None:
-            config["custom_js_batch_size"] = self.custom_js_batch_size
-        if self.custom_js_cooldown_seconds is not None:
-            config["custom_js_cooldown_seconds"] = self.custom_js_cooldown_seconds
-        if self.custom_js_timeout is not None:
-            config["custom_js_timeout"] = self.custom_js_timeout
-        if self.decodo_enabled is not None:
-            config["decodo_enabled"] = self.decodo_enabled
-        if self.decodo_timeout is not None:
-            config["decodo_timeout"] = self.decodo_timeout
-        if self.min_content_length is not None:
-            config["min_content_length"] = self.min_content_length
-        if self.min_text_length is not None:
-            config["min_text_length"] = self.min_text_length
-        if self.save_outputs is not None:
-            config["save_outputs"] = self.save_outputs
-        if self.enable_logging is not None:
-            config["enable_logging"] = self.enable_logging
+        config = {
+            field: value
+            for field in _CONFIG_FIELDS
+            for value in (getattr(self, field),)
+            if value is not None
+        }
         
         if config:
             data["config"] = config
         
         return data
+    
+    def to_json(self) -> bytes:
+        """
+        Serialize to the API request body.
+        
+        Equivalent to JSON-encoding to_dict(), but the config block is cached
+        so repeated batches with the same settings only encode their URLs.
+        """
+        config_items = tuple(
+            (field, tuple(value) if isinstance(value, list) else value)
+            for field in _CONFIG_FIELDS
+            for value in (getattr(self, field),)
+            if value is not None
+        )
+        
+        body = b'{"urls":' + _dumps(self.urls)
+        if config_items:
+            body += b',"config":' + _config_json(config_items)
+        return body + b'}'
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class URLResult:
     """Result for a single URL."""
     
@@ -85,7 +160,7 @@ class URLResult:
         return self.status == "failed"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BatchSummary:
     """Summary statistics for batch processing."""
     
@@ -103,7 +178,7 @@ class BatchSummary:
         return (self.success / self.total) * 100
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BatchResponse:
     """Response from batch URL fetching."""
     
@@ -111,17 +186,194 @@ class BatchResponse:
     summary: BatchSummary
     success: bool
     
+    # Indices into results, built once so repeated filtering is a lookup
+    _success_idx: List[int] = field(init=False, repr=False, compare=False)
+    _failed_idx: List[int] = field(init=False, repr=False, compare=False)
+    _method_idx: Dict[str, List[int]] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._success_idx = []
+        self._failed_idx = []
+        self._method_idx = {}
+        for i, r in enumerate(self.results):
+            if r.is_success:
+                self._success_idx.append(i)
+            elif r.is_failed:
+                self._failed_idx.append(i)
+            self._method_idx.setdefault(r.method, []).append(i)
+    
+    @property
+    def count_success(self) -> int:
+        """Number of successful results."""
+        return len(self._success_idx)
+    
     def get_successful(self) -> List[URLResult]:
         """Get only successful results."""
-        return [r for r in self.results if r.is_success]
+        return [self.results[i] for i in self._success_idx]
     
     def get_failed(self) -> List[URLResult]:
         """Get only failed results."""
-        return [r for r in self.results if r.is_failed]
+        return [self.results[i] for i in self._failed_idx]
     
     def get_by_method(self, method: str) -> List[URLResult]:
         """Get results by method (static, xhr, custom_js, decodo)."""
-        return [r for r in self.results if r.method == method]
+        return [self.results[i] for i in self._method_idx.get(method, ())]
+
+
+def _parse_url_result(r: Dict[str, Any]) -> URLResult:
+    """Convert a single decoded result item into a URLResult."""
+    return URLResult(
+        url=r["url"],
+        html=r.get("html"),
+        method=r.get("method"),
+        status=r["status"],
+        error=r.get("error")
+    )
+
+
+def _parse_batch_response(data: Dict[str, Any]) -> BatchResponse:
+    """Convert a decoded /api/v1/fetch-batch payload into response objects."""
+    results = [_parse_url_result(r) for r in data["results"]]
+    
+    summary = BatchSummary(
+        total=data["summary"]["total"],
+        success=data["summary"]["success"],
+        failed=data["summary"]["failed"],
+        by_method=data["summary"]["by_method"],
+        total_time=data["summary"]["total_time"]
+    )
+    
+    return BatchResponse(
+        results=results,
+        summary=summary,
+        success=data["success"]
+    )
+
+
+def _expand_duplicates(response: BatchResponse, urls: List[str]) -> BatchResponse:
+    """
+    Fan results for a de-duplicated request back out to the caller's URL list.
+    
+    Each input position gets the result for its URL (duplicates share the
+    same URLResult) and the summary counts are recomputed over the expanded
+    list, the same way the API computes them.
+    """
+    by_url = {r.url: r for r in response.results}
+    if any(url not in by_url for url in urls):
+        # Server reported results under different URLs; leave them as-is
+        return response
+    
+    results = [by_url[url] for url in urls]
+    success = sum(1 for r in results if r.status == "success")
+    by_method = Counter(r.method for r in results if r.method)
+    
+    summary = BatchSummary(
+        total=len(results),
+        success=success,
+        failed=len(results) - success,
+        by_method=dict(by_method),
+        total_time=response.summary.total_time
+    )
+    
+    return BatchResponse(
+        results=results,
+        summary=summary,
+        success=response.success
+    )
+
+
+def _merge_batch_responses(responses: List[BatchResponse]) -> BatchResponse:
+    """
+    Merge responses for consecutive URL chunks into a single response.
+    
+    Results keep chunk order; counts are summed and total_time is the
+    slowest chunk since chunks are processed in parallel.
+    """
+    if len(responses) == 1:
+        return responses[0]
+    
+    results = [r for response in responses for r in response.results]
+    by_method = Counter()
+    for response in responses:
+        by_method.update(response.summary.by_method)
+    
+    summary = BatchSummary(
+        total=sum(r.summary.total for r in responses),
+        success=sum(r.summary.success for r in responses),
+        failed=sum(r.summary.failed for r in responses),
+        by_method=dict(by_method),
+        total_time=max(r.summary.total_time for r in responses)
+    )
+    
+    return BatchResponse(
+        results=results,
+        summary=summary,
+        success=all(r.success for r in responses)
+    )
+
+
+def _chunk_urls(urls: List[str], chunk_size: int) -> List[List[str]]:
+    """Split urls into consecutive chunks of at most chunk_size."""
+    return [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+
+
+def _build_session() -> requests.Session:
+    """Create a requests session with a pooled, retrying adapter."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        # Only idempotent GETs are resent on 5xx; a batch POST can run for an
+        # hour, so it is never re-rendered behind the caller's back. Once
+        # retries run out the last response is returned, so callers still
+        # see the status and error body instead of a RetryError
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods={"GET"},
+            raise_on_status=False
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # HTML payloads compress well; advertise every encoding urllib3
+    # can decode (includes br when brotli is installed)
+    session.headers.update({
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive"
+    })
+    return session
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def _get_shared_session() -> Tuple[requests.Session, bool]:
+    """Return the process-wide session, creating it on first use, and whether it was just created."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = _build_session()
+            return _shared_session, True
+        return _shared_session, False
+
+
+def shutdown():
+    """
+    Close the connection pool shared by URLToHTMLClient instances.
+    
+    Registered with atexit; clients created afterwards get a fresh pool.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
+
+atexit.register(shutdown)
 
 
 class URLToHTMLClient:
@@ -159,7 +411,11 @@ class URLToHTMLClient:
         self,
         base_url: str = "http://localhost:8000",
         timeout: int = 3600,  # 1 hour default for large batches
-        verify_ssl: bool = True
+        verify_ssl: bool = True,
+        session: Optional[requests.Session] = None,
+        warm: Optional[bool] = None,
+        base_urls: Optional[List[str]] = None,
+        share_pool: bool = True
     ):
         """
         Initialize the client.
@@ -168,11 +424,57 @@ class URLToHTMLClient:
             base_url: Base URL of the API (default: "http://localhost:8000")
             timeout: Request timeout in seconds (default: 3600 for large batches)
             verify_ssl: Whether to verify SSL certificates (default: True)
+            session: Pre-configured requests.Session to use instead of the
+                default pooled session (default: None)
+            warm: Open a keep-alive connection to the API in the background so
+                the first real call skips the TCP/TLS handshake. None warms only
+                when this client creates the pool (a private one, or the shared
+                one on first use), so clients reusing a pool send no extra
+                HEAD (default: None)
+            base_urls: Base URLs of several API replicas; requests are spread
+                across them round-robin. Overrides base_url (default: None)
+            share_pool: Use the connection pool shared by all clients in this
+                process instead of a private one; ignored when session is
+                given (default: True)
         """
-        self.base_url = base_url.rstrip('/')
+        self.base_urls = tuple(u.rstrip('/') for u in (base_urls or [base_url]))
+        self.base_url = self.base_urls[0]
+        self._rr = itertools.cycle(self.base_urls)
+        self._rr_lock = threading.Lock()
         self.timeout = timeout
         self.verify_ssl = verify_ssl
-        self.session = requests.Session()
+        self._uses_shared_pool = session is None and share_pool
+        built_pool = session is None
+        if session is None:
+            if share_pool:
+                session, built_pool = _get_shared_session()
+            else:
+                session = _build_session()
+        self.session = session
+        if warm is None:
+            warm = built_pool
+        
+        if warm:
+            threading.Thread(target=self._warm, daemon=True).start()
+    
+    def _warm(self):
+        """Prime the connection pool; any response (even 405) leaves a live connection."""
+        for base_url in self.base_urls:
+            try:
+                self.session.head(
+                    f"{base_url}/health",
+                    timeout=5,
+                    verify=self.verify_ssl
+                )
+            except requests.RequestException:
+                pass
+    
+    def _next_base_url(self) -> str:
+        """Pick the next API replica (round-robin, thread-safe)."""
+        if len(self.base_urls) == 1:
+            return self.base_url
+        with self._rr_lock:
+            return next(self._rr)
     
     def health_check(self) -> Dict[str, Any]:
         """
@@ -188,12 +490,12 @@ class URLToHTMLClient:
             ```
         """
         response = self.session.get(
-            f"{self.base_url}/health",
+            f"{self._next_base_url()}/health",
             timeout=10,
             verify=self.verify_ssl
         )
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def get_api_info(self) -> Dict[str, Any]:
         """
@@ -209,12 +511,12 @@ class URLToHTMLClient:
             ```
         """
         response = self.session.get(
-            f"{self.base_url}/",
+            f"{self._next_base_url()}/",
             timeout=10,
             verify=self.verify_ssl
         )
         response.raise_for_status()
-        return response.json()
+        return _loads(response.content)
     
     def fetch_batch(
         self,
@@ -222,6 +524,7 @@ class URLToHTMLClient:
         static_xhr_concurrency: Optional[int] = None,
         custom_js_service_endpoints: Optional[List[str]] = None,
         custom_js_batch_size: Optional[int] = None,
+        chunk_size: Optional[int] = None,
         **kwargs
     ) -> BatchResponse:
         """
@@ -234,11 +537,22 @@ class URLToHTMLClient:
         3. Custom JS rendering (multi-service parallel)
         4. Decodo fallback (for failed URLs)
         
+        Duplicate URLs are sent to the API only once; the returned results
+        still line up one-to-one with ``urls`` (duplicates share the same
+        URLResult) and the summary counts every input position.
+        
+        By default the whole batch goes out as one API request. Pass
+        ``chunk_size`` to opt in to splitting larger batches into
+        sub-requests that run in parallel (up to 16 at a time) and are merged
+        in input order, so a multi-worker API processes them concurrently
+        and a failure only affects one chunk's request.
+        
         Args:
             urls: List of URLs to fetch (1-10000 URLs)
             static_xhr_concurrency: Max concurrent static/XHR requests (default: 100)
             custom_js_service_endpoints: List of custom JS rendering service endpoints
             custom_js_batch_size: URLs per batch for custom JS (default: 20)
+            chunk_size: Max URLs per API request; None sends one request (default: None)
             **kwargs: Additional configuration options:
                 - static_xhr_timeout: Timeout for static/XHR requests
                 - custom_js_cooldown_seconds: Cooldown between batches
@@ -291,7 +605,70 @@ class URLToHTMLClient:
                 print(f"Failed {result.url}: {result.error}")
             ```
         """
+        # Only send each distinct URL once
+        unique_urls = list(dict.fromkeys(urls))
+        config = dict(
+            static_xhr_concurrency=static_xhr_concurrency,
+            custom_js_service_endpoints=custom_js_service_endpoints,
+            custom_js_batch_size=custom_js_batch_size,
+            **kwargs
+        )
+        
+        if chunk_size and len(unique_urls) > chunk_size:
+            chunks = _chunk_urls(unique_urls, chunk_size)
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 16)) as executor:
+                responses = list(executor.map(
+                    lambda chunk: self._fetch_batch_single(chunk, **config),
+                    chunks
+                ))
+            batch_response = _merge_batch_responses(responses)
+        else:
+            batch_response = self._fetch_batch_single(unique_urls, **config)
+        
+        if len(unique_urls) != len(urls):
+            batch_response = _expand_duplicates(batch_response, urls)
+        return batch_response
+    
+    def _fetch_batch_single(self, urls: List[str], **config) -> BatchResponse:
+        """Send one API request for urls and parse the response."""
         # Build request
+        request = BatchRequest(urls=urls, **config)
+        
+        # Make API request
+        response = self._post_batch(request)
+        
+        # Parse response
+        return _parse_batch_response(_loads(response.content))
+    
+    def iter_results(
+        self,
+        urls: List[str],
+        static_xhr_concurrency: Optional[int] = None,
+        custom_js_service_endpoints: Optional[List[str]] = None,
+        custom_js_batch_size: Optional[int] = None,
+        **kwargs
+    ) -> Iterator[URLResult]:
+        """
+        Fetch a batch of URLs and yield results as they are parsed.
+        
+        Streaming counterpart of fetch_batch: the response body is decoded
+        incrementally with ijson, so only one URLResult needs to be held in
+        memory at a time. Falls back to a buffered parse when ijson is not
+        installed (pip install url-to-html[stream]).
+        
+        Args:
+            Same as fetch_batch.
+        
+        Yields:
+            URLResult for each URL, in response order
+            
+        Example:
+            ```python
+            for result in client.iter_results(urls):
+                if result.is_success:
+                    save(result.url, result.html)
+            ```
+        """
         request = BatchRequest(
             urls=urls,
             static_xhr_concurrency=static_xhr_concurrency,
@@ -300,13 +677,65 @@ class URLToHTMLClient:
             **kwargs
         )
         
-        # Make API request
+        response = self._post_batch(request, stream=True)
+        try:
+            if ijson is None:
+                for r in _loads(response.content)["results"]:
+                    yield _parse_url_result(r)
+            else:
+                response.raw.decode_content = True
+                for r in ijson.items(response.raw, "results.item"):
+                    yield _parse_url_result(r)
+        finally:
+            response.close()
+    
+    def fetch_batch_iter(
+        self,
+        urls: Iterable[str],
+        chunk_size: int = 500,
+        **kwargs
+    ) -> Iterator[URLResult]:
+        """
+        Fetch an arbitrarily large stream of URLs chunk by chunk.
+        
+        URLs are pulled lazily from ``urls`` (a file, generator, DB cursor...)
+        ``chunk_size`` at a time, each chunk is sent as one API request and
+        its results are streamed back via iter_results, so memory stays flat
+        regardless of input size. Blank entries are skipped.
+        
+        Args:
+            urls: Iterable of URLs
+            chunk_size: URLs per API request (default: 500)
+            **kwargs: Configuration options (same as fetch_batch)
+        
+        Yields:
+            URLResult for each URL, in input order
+            
+        Example:
+            ```python
+            with open("urls.txt") as f:
+                for result in client.fetch_batch_iter(map(str.strip, f)):
+                    print(result.url, result.status)
+            ```
+        """
+        url_iter = (url for url in urls if url)
+        while True:
+            chunk = list(itertools.islice(url_iter, chunk_size))
+            if not chunk:
+                return
+            yield from self.iter_results(chunk, **kwargs)
+    
+    def _post_batch(self, request: BatchRequest, stream: bool = False) -> requests.Response:
+        """POST a batch request and raise on API errors."""
+        # Session.post (not send) so proxies, CA bundle, cookies and auth are
+        # merged from the session and environment on every call
         response = self.session.post(
-            f"{self.base_url}/api/v1/fetch-batch",
-            json=request.to_dict(),
+            f"{self._next_base_url()}/api/v1/fetch-batch",
+            data=request.to_json(),
+            headers=_JSON_HEADERS,
             timeout=self.timeout,
             verify=self.verify_ssl,
-            headers={"Content-Type": "application/json"}
+            stream=stream
         )
         
         # Handle errors
@@ -315,7 +744,7 @@ class URLToHTMLClient:
         except requests.HTTPError as e:
             # Try to get error details from response
             try:
-                error_data = response.json()
+                error_data = _loads(response.content)
                 error_msg = error_data.get("error", str(e))
                 detail = error_data.get("detail", "")
                 raise requests.HTTPError(
@@ -325,34 +754,7 @@ class URLToHTMLClient:
             except (ValueError, KeyError):
                 raise e
         
-        # Parse response
-        data = response.json()
-        
-        # Convert to response objects
-        results = [
-            URLResult(
-                url=r["url"],
-                html=r.get("html"),
-                method=r.get("method"),
-                status=r["status"],
-                error=r.get("error")
-            )
-            for r in data["results"]
-        ]
-        
-        summary = BatchSummary(
-            total=data["summary"]["total"],
-            success=data["summary"]["success"],
-            failed=data["summary"]["failed"],
-            by_method=data["summary"]["by_method"],
-            total_time=data["summary"]["total_time"]
-        )
-        
-        return BatchResponse(
-            results=results,
-            summary=summary,
-            success=data["success"]
-        )
+        return response
     
     def fetch_single(self, url: str, **kwargs) -> Optional[str]:
         """
@@ -378,8 +780,9 @@ class URLToHTMLClient:
         return None
     
     def close(self):
-        """Close the session (cleanup)."""
-        self.session.close()
+        """Close the session (cleanup). The shared pool is closed by shutdown()."""
+        if not self._uses_shared_pool:
+            self.session.close()
     
     def __enter__(self):
         """Context manager entry."""
@@ -389,3 +792,208 @@ class URLToHTMLClient:
         """Context manager exit."""
         self.close()
 
+
+
+class AsyncURLToHTMLClient:
+    """
+    Asynchronous client for URL to HTML Converter API.
+    
+    Same API as URLToHTMLClient, but every network method is a coroutine so
+    many batches and health checks can be in flight at once on a single
+    pooled aiohttp session.
+    
+    Example:
+        ```python
+        import asyncio
+        from client import AsyncURLToHTMLClient
+        
+        async def main():
+            async with AsyncURLToHTMLClient(base_url="http://localhost:8000") as client:
+                health, response = await asyncio.gather(
+                    client.health_check(),
+                    client.fetch_batch(["https://example.com"])
+                )
+                print(health['status'], response.summary.success)
+        
+        asyncio.run(main())
+        ```
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        timeout: int = 3600,  # 1 hour default for large batches
+        verify_ssl: bool = True,
+        connection_limit: int = 200,
+        connection_limit_per_host: int = 20,
+        base_urls: Optional[List[str]] = None
+    ):
+        """
+        Initialize the client.
+        
+        The underlying aiohttp session is created lazily on first use, so the
+        client can be constructed outside of a running event loop.
+        
+        Args:
+            base_url: Base URL of the API (default: "http://localhost:8000")
+            timeout: Request timeout in seconds (default: 3600 for large batches)
+            verify_ssl: Whether to verify SSL certificates (default: True)
+            connection_limit: Total connection pool size (default: 200)
+            connection_limit_per_host: Connections per API host (default: 20)
+            base_urls: Base URLs of several API replicas; requests are spread
+                across them round-robin. Overrides base_url (default: None)
+        
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncURLToHTMLClient requires aiohttp (pip install aiohttp)")
+        self.base_urls = tuple(u.rstrip('/') for u in (base_urls or [base_url]))
+        self.base_url = self.base_urls[0]
+        self._rr = itertools.cycle(self.base_urls)
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self._session: Optional["aiohttp.ClientSession"] = None
+    
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """Pooled aiohttp session (created on first access)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                enable_cleanup_closed=True,
+                ssl=self.verify_ssl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=10)
+            )
+        return self._session
+    
+    async def _get_json(self, path: str) -> Dict[str, Any]:
+        async with self.session.get(
+            f"{next(self._rr)}{path}",
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as response:
+            response.raise_for_status()
+            return _loads(await response.read())
+    
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Check API health.
+        
+        Returns:
+            Health status information
+        """
+        return await self._get_json("/health")
+    
+    async def get_api_info(self) -> Dict[str, Any]:
+        """
+        Get API information.
+        
+        Returns:
+            API information including version and endpoints
+        """
+        return await self._get_json("/")
+    
+    async def fetch_batch(
+        self,
+        urls: List[str],
+        static_xhr_concurrency: Optional[int] = None,
+        custom_js_service_endpoints: Optional[List[str]] = None,
+        custom_js_batch_size: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs
+    ) -> BatchResponse:
+        """
+        Fetch HTML content for a batch of URLs.
+        
+        Accepts the same arguments as URLToHTMLClient.fetch_batch, including
+        its handling of duplicate URLs and opt-in chunking (chunks are sent
+        concurrently with asyncio.gather).
+        
+        Returns:
+            BatchResponse with results and summary
+            
+        Raises:
+            aiohttp.ClientResponseError: If the API request fails
+            aiohttp.ClientError: If there's a network error
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        config = dict(
+            static_xhr_concurrency=static_xhr_concurrency,
+            custom_js_service_endpoints=custom_js_service_endpoints,
+            custom_js_batch_size=custom_js_batch_size,
+            **kwargs
+        )
+        
+        if chunk_size and len(unique_urls) > chunk_size:
+            responses = await asyncio.gather(*(
+                self._fetch_batch_single(chunk, **config)
+                for chunk in _chunk_urls(unique_urls, chunk_size)
+            ))
+            batch_response = _merge_batch_responses(list(responses))
+        else:
+            batch_response = await self._fetch_batch_single(unique_urls, **config)
+        
+        if len(unique_urls) != len(urls):
+            batch_response = _expand_duplicates(batch_response, urls)
+        return batch_response
+    
+    async def _fetch_batch_single(self, urls: List[str], **config) -> BatchResponse:
+        """Send one API request for urls and parse the response."""
+        request = BatchRequest(urls=urls, **config)
+        
+        async with self.session.post(
+            f"{next(self._rr)}/api/v1/fetch-batch",
+            data=request.to_json(),
+            headers=_JSON_HEADERS
+        ) as response:
+            if response.status >= 400:
+                # Try to get error details from response
+                try:
+                    error_data = _loads(await response.read())
+                    error_msg = error_data.get("error", response.reason)
+                    detail = error_data.get("detail", "")
+                    message = f"{error_msg}: {detail}" if detail else error_msg
+                except (ValueError, KeyError, AttributeError):
+                    message = response.reason
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=message,
+                    headers=response.headers
+                )
+            data = _loads(await response.read())
+        
+        return _parse_batch_response(data)
+    
+    async def fetch_single(self, url: str, **kwargs) -> Optional[str]:
+        """
+        Fetch HTML content for a single URL (convenience method).
+        
+        Returns:
+            HTML content as string, or None if failed
+        """
+        response = await self.fetch_batch([url], **kwargs)
+        if response.results and response.results[0].is_success:
+            return response.results[0].html
+        return None
+    
+    async def close(self):
+        """Close the session (cleanup)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
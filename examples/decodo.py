@@ -5,15 +5,31 @@ This is a standalone example - just copy and use it!
 Fetches HTML from URLs and saves them to files in the examples folder.
 """
 
-import requests
-import json
+import importlib.util
 import os
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
 import re
 
+try:
+    import httpx
+except ImportError:
+    # httpx not installed, send the request with requests instead
+    httpx = None
+    import requests
+
+# HTTP/2 needs the h2 package (pip install httpx[http2]); without it httpx speaks HTTP/1.1
+HTTP2 = importlib.util.find_spec("h2") is not None
+
 # Configuration
 API_URL = "https://urltohtml-production.up.railway.app/api/v1/fetch-batch"
 
+# Characters not allowed in saved filenames
+_FILENAME_RE = re.compile(r'[^\w\-_]')
+
+# Save to examples folder (same directory as this script)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Your URLs to process
 urls = [
         "https://www.meesho.com/search?q=saree"
@@ -30,12 +46,10 @@ def save_html(url, html_content, method):
         path = 'index'
     
     # Remove any special characters
-    filename = re.sub(r'[^\w\-_]', '_', f"{method}_{domain}_{path}")
+    filename = _FILENAME_RE.sub('_', f"{method}_{domain}_{path}")
     filename = f"{filename}.html"
     
-    # Save to examples folder (same directory as this script)
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    filepath = os.path.join(script_dir, filename)
+    filepath = os.path.join(SCRIPT_DIR, filename)
     
     try:
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -51,11 +65,19 @@ print(f"Sending {len(urls)} URLs to API...")
 print(f"API: {API_URL}")
 print()
 
-response = requests.post(
-    API_URL,
-    json={"urls": urls},
-    timeout=3600  # 1 hour timeout
-)
+# httpx advertises and decodes gzip (and br when brotli is installed)
+if httpx is not None:
+    with httpx.Client(http2=HTTP2, timeout=3600.0) as client:  # 1 hour timeout
+        response = client.post(
+            API_URL,
+            json={"urls": urls}
+        )
+else:
+    response = requests.post(
+        API_URL,
+        json={"urls": urls},
+        timeout=3600  # 1 hour timeout
+    )
 
 # Check if request was successful
 if response.status_code == 200:
@@ -83,16 +105,18 @@ if response.status_code == 200:
     successful = [r for r in data["results"] if r["status"] == "success"]
     if successful:
         print(f"Successful URLs ({len(successful)}):")
-        for result in successful:
-            html_size = len(result.get("html", ""))
-            print(f"  ✓ {result['url']}")
-            print(f"    Method: {result['method']}, Size: {html_size:,} bytes")
-            
-            # Save HTML to file
-            if result.get("html"):
-                save_html(result['url'], result['html'], result['method'])
-            
-            print()
+        # File writes are I/O-bound, so save pages in parallel
+        with ThreadPoolExecutor(max_workers=8) as writer:
+            for result in successful:
+                html_size = len(result.get("html", ""))
+                print(f"  ✓ {result['url']}")
+                print(f"    Method: {result['method']}, Size: {html_size:,} bytes")
+                
+                # Save HTML to file
+                if result.get("html"):
+                    writer.submit(save_html, result['url'], result['html'], result['method'])
+                
+                print()
     
     # Show failed URLs
     failed = [r for r in data["results"] if r["status"] == "failed"]
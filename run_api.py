@@ -5,6 +5,7 @@ Entry point for running the URL to HTML Converter API.
 
 import os
 import sys
+import importlib.util
 import uvicorn
 from api.config import APIConfig
 
@@ -15,11 +16,16 @@ if __name__ == "__main__":
     workers = int(os.getenv("API_WORKERS", APIConfig.WORKERS))
     log_level = os.getenv("LOG_LEVEL", APIConfig.LOG_LEVEL.lower())
     
+    # Prefer uvloop + httptools when available (uvloop does not support Windows)
+    loop = "uvloop" if sys.platform != "win32" and importlib.util.find_spec("uvloop") else "auto"
+    http = "httptools" if importlib.util.find_spec("httptools") else "auto"
+    
     print(f"Starting URL to HTML Converter API")
     print(f"Host: {host}")
     print(f"Port: {port}")
     print(f"Workers: {workers}")
     print(f"Log Level: {log_level}")
+    print(f"Event Loop: {loop}, HTTP Parser: {http}")
     print(f"API Version: {APIConfig.API_VERSION}")
     print(f"\nAPI Documentation available at: http://{host}:{port}/docs")
     print(f"ReDoc available at: http://{host}:{port}/redoc")
@@ -32,6 +38,8 @@ if __name__ == "__main__":
         port=port,
         workers=workers if workers > 1 else None,  # Only use workers if > 1
         log_level=log_level,
+        loop=loop,
+        http=http,
         reload=os.getenv("RELOAD", "false").lower() == "true",  # Auto-reload for development
         access_log=True
     )
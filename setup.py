@@ -20,9 +20,23 @@ setup(
     install_requires=[
         "requests>=2.25.0",
         "beautifulsoup4>=4.9.0",
+        "aiohttp>=3.8.0",
+        "aiolimiter>=1.1.0",
     ],
     extras_require={
-        "fast": ["lxml>=4.6.0"],
+        "fast": [
+            "lxml>=4.6.0",
+            "selectolax>=0.3.17",
+            "xxhash>=2.0.0",
+            "orjson>=3.6.0",
+            "uvloop>=0.17.0; sys_platform != 'win32'",
+            "httptools>=0.5.0",
+            "httpx[http2]>=0.24.0",
+            "aiodns>=3.0.0",
+        ],
+        "stream": ["ijson>=3.0"],
+        "brotli": ["brotli>=1.0.9"],
+        "zstd": ["zstandard>=0.18.0"],
     },
 )
 
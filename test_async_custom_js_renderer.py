@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check that AsyncCustomJSRenderer gives every input URL exactly one result.
+
+A local aiohttp server stands in for the rendering service and reports some
+URLs under a redirected name; runs under pytest or directly.
+"""
+
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from url_to_html.async_custom_js_renderer import AsyncCustomJSRenderer
+
+URLS = [
+    "https://example.com/a",
+    "https://example.com/redirects",
+    "https://example.com/a",
+    "https://example.com/c",
+]
+
+
+def _rendered(url):
+    """The service's answer for url; one URL is reported under its redirect target."""
+    reported = url + "/landing" if url.endswith("/redirects") else url
+    return {"url": reported, "status": "success", "html": f"<p>{url}</p>"}
+
+
+async def _render_sse(request):
+    urls = (await request.json())["urls"]
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    # Completion order differs from request order
+    for url in reversed(urls):
+        await response.write(b"data: " + json.dumps(_rendered(url)).encode() + b"\n\n")
+    await response.write_eof()
+    return response
+
+
+async def _render_json(request):
+    urls = (await request.json())["urls"]
+    return web.json_response({"results": [_rendered(url) for url in urls]})
+
+
+async def _render(path, call):
+    app = web.Application()
+    app.router.add_post("/sse", _render_sse)
+    app.router.add_post("/json", _render_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    renderer = AsyncCustomJSRenderer(
+        api_url=f"http://127.0.0.1:{port}{path}", batch_size=3, cooldown_seconds=0.01
+    )
+    try:
+        async with renderer:
+            return await call(renderer)
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.parametrize("path", ["/sse", "/json"])
+def test_process_urls_matches_inputs_by_position(path):
+    results = asyncio.run(_render(path, lambda renderer: renderer.process_urls(URLS)))
+    assert [r["url"] for r in results] == URLS
+    assert [r["html"] for r in results] == [f"<p>{url}</p>" for url in URLS]
+    assert all(r["status"] == "success" for r in results)
+
+
+@pytest.mark.parametrize("path", ["/sse", "/json"])
+def test_stream_urls_yields_one_result_per_input(path):
+    async def collect(renderer):
+        return [result async for result in renderer.stream_urls(URLS)]
+    results = asyncio.run(_render(path, collect))
+    assert sorted(r["url"] for r in results) == sorted(URLS)
+    assert all(r["status"] == "success" for r in results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
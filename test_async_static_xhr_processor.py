@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check that AsyncStaticXHRProcessor never passes off a cut-off body as a fetch.
+
+Serves pages from a local aiohttp server; runs under pytest or directly.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from url_to_html.async_static_xhr_processor import AsyncStaticXHRProcessor
+from url_to_html.exceptions import ResponseTooLargeError
+
+MAX_BYTES = 64 * 1024
+PAGE = "<html><body>" + "<div><p>Product description text</p></div>" * 200 + "</body></html>"
+OVERSIZED_PAGE = "<html><body>" + "<p>x</p>" * MAX_BYTES + "</body></html>"
+
+
+async def _serve_page(request):
+    return web.Response(text=PAGE, content_type="text/html")
+
+
+async def _serve_oversized(request):
+    return web.Response(text=OVERSIZED_PAGE, content_type="text/html")
+
+
+async def _serve_oversized_chunked(request):
+    # No Content-Length, so the cap has to trip while reading
+    response = web.StreamResponse(headers={"Content-Type": "text/html"})
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    await response.write(OVERSIZED_PAGE.encode())
+    await response.write_eof()
+    return response
+
+
+async def _run_server(handler):
+    app = web.Application()
+    app.router.add_get("/", _serve_page)
+    app.router.add_get("/big", _serve_oversized)
+    app.router.add_get("/big-chunked", _serve_oversized_chunked)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await handler(f"http://127.0.0.1:{port}")
+    finally:
+        await runner.cleanup()
+
+
+def _process(paths):
+    async def handler(base_url):
+        processor = AsyncStaticXHRProcessor(max_response_bytes=MAX_BYTES, static_retries=0)
+        return await processor.process_batch([base_url + path for path in paths])
+    return asyncio.run(_run_server(handler))
+
+
+def test_page_under_cap_is_fetched():
+    (result,) = _process(["/"])
+    assert result["method"] == "static"
+    assert result["html"] == PAGE
+
+
+@pytest.mark.parametrize("path", ["/big", "/big-chunked"])
+def test_oversized_body_falls_back(path):
+    (result,) = _process([path])
+    assert result["html"] is None
+    assert result["method"] is None
+    assert result["needs_js"] is True
+
+
+@pytest.mark.parametrize("path", ["/big", "/big-chunked"])
+def test_read_capped_raises(path):
+    async def handler(base_url):
+        processor = AsyncStaticXHRProcessor(max_response_bytes=MAX_BYTES)
+        async with processor:
+            async with processor._session.get(base_url + path) as response:
+                with pytest.raises(ResponseTooLargeError) as excinfo:
+                    await processor._read_capped(response)
+        assert excinfo.value.max_bytes == MAX_BYTES
+    asyncio.run(_run_server(handler))
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
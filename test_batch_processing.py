@@ -5,134 +5,30 @@ Test script for batch processing 100+ URLs with all fallbacks.
 
 import asyncio
 import logging
-from url_to_html.async_batch_fetcher import async_fetch_batch
-from url_to_html.batch_config import BatchFetcherConfig
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from url_to_html.async_batch_fetcher import async_fetch_batch, iter_urls
+from url_to_html.batch_config import BatchFetcherConfig, setup_event_loop
 
-# Setup logging
+# Setup logging: the event loop only enqueues records, a listener thread writes them
+_log_queue = queue.SimpleQueue()
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+log_listener = QueueListener(_log_queue, _console_handler)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(levelname)s - %(message)s'
+    handlers=[QueueHandler(_log_queue)]
 )
 
-# Test URLs - mix of different domains
-TEST_URLS = [
-    # Flipkart URLs (20)
-    "https://www.flipkart.com/search?q=tablets",
-    "https://www.flipkart.com/search?q=speakers",
-    "https://www.flipkart.com/search?q=keyboards",
-    "https://www.flipkart.com/search?q=mice",
-    "https://www.flipkart.com/search?q=monitors",
-    "https://www.flipkart.com/search?q=printers",
-    "https://www.flipkart.com/search?q=hard+drives",
-    "https://www.flipkart.com/search?q=pendrives",
-    "https://www.flipkart.com/search?q=chargers",
-    "https://www.flipkart.com/search?q=cables",
-    "https://www.flipkart.com/search?q=webcams",
-    "https://www.flipkart.com/search?q=usb+hubs",
-    "https://www.flipkart.com/search?q=power+banks",
-    "https://www.flipkart.com/search?q=wireless+chargers",
-    "https://www.flipkart.com/search?q=headphones",
-    "https://www.flipkart.com/search?q=earphones",
-    "https://www.flipkart.com/search?q=bluetooth+speakers",
-    "https://www.flipkart.com/search?q=smart+watches",
-    "https://www.flipkart.com/search?q=fitness+bands",
-    "https://www.flipkart.com/search?q=smartphones",
-    
-    # Amazon URLs (20)
-    "https://www.amazon.in/s?k=webcams",
-    "https://www.amazon.in/s?k=usb+hubs",
-    "https://www.amazon.in/s?k=power+banks",
-    "https://www.amazon.in/s?k=wireless+chargers",
-    "https://www.amazon.in/s?k=laptops",
-    "https://www.amazon.in/s?k=tablets",
-    "https://www.amazon.in/s?k=smartphones",
-    "https://www.amazon.in/s?k=headphones",
-    "https://www.amazon.in/s?k=speakers",
-    "https://www.amazon.in/s?k=keyboards",
-    "https://www.amazon.in/s?k=mice",
-    "https://www.amazon.in/s?k=monitors",
-    "https://www.amazon.in/s?k=printers",
-    "https://www.amazon.in/s?k=hard+drives",
-    "https://www.amazon.in/s?k=pendrives",
-    "https://www.amazon.in/s?k=chargers",
-    "https://www.amazon.in/s?k=cables",
-    "https://www.amazon.in/s?k=smart+watches",
-    "https://www.amazon.in/s?k=fitness+bands",
-    "https://www.amazon.in/s?k=bluetooth+speakers",
-    
-    # Nykaa URLs (15)
-    "https://www.nykaa.com/skin/sunscreens/c/8394",
-    "https://www.nykaa.com/hair/hair-care/conditioner/c/1222",
-    "https://www.nykaa.com/makeup/cheeks/blush/c/747",
-    "https://www.nykaa.com/skin/moisturizers/c/8386",
-    "https://www.nykaa.com/makeup/lips/lipstick/c/744",
-    "https://www.nykaa.com/hair/hair-care/shampoo/c/1221",
-    "https://www.nykaa.com/skin/cleansers/c/8381",
-    "https://www.nykaa.com/makeup/eyes/eyeliner/c/751",
-    "https://www.nykaa.com/makeup/face/foundation/c/748",
-    "https://www.nykaa.com/skin/toners/c/8382",
-    "https://www.nykaa.com/hair/hair-care/hair+masks/c/1223",
-    "https://www.nykaa.com/makeup/cheeks/highlighter/c/749",
-    "https://www.nykaa.com/skin/serums/c/8383",
-    "https://www.nykaa.com/makeup/eyes/mascara/c/752",
-    "https://www.nykaa.com/skin/face-wash/c/8380",
-    
-    # Myntra URLs (10)
-    "https://www.myntra.com/women-jeans",
-    "https://www.myntra.com/men-shoes",
-    "https://www.myntra.com/women-shoes",
-    "https://www.myntra.com/men-tshirts",
-    "https://www.myntra.com/women-dresses",
-    "https://www.myntra.com/men-shirts",
-    "https://www.myntra.com/women-handbags",
-    "https://www.myntra.com/men-watches",
-    "https://www.myntra.com/women-watches",
-    "https://www.myntra.com/men-jeans",
-    
-    # Meesho URLs (10)
-    "https://www.meesho.com/search?q=kurthi",
-    "https://www.meesho.com/search?q=saree",
-    "https://www.meesho.com/search?q=dress",
-    "https://www.meesho.com/search?q=shirt",
-    "https://www.meesho.com/search?q=jeans",
-    "https://www.meesho.com/search?q=shoes",
-    "https://www.meesho.com/search?q=bag",
-    "https://www.meesho.com/search?q=watch",
-    "https://www.meesho.com/search?q=jewellery",
-    "https://www.meesho.com/search?q=makeup",
-    
-    # Other URLs (25)
-    "https://www.snapdeal.com/",
-    "https://www.shopclues.com/",
-    "https://www.paytm.com/",
-    "https://www.bigbasket.com/",
-    "https://www.zomato.com/",
-    "https://www.swiggy.com/",
-    "https://www.uber.com/",
-    "https://www.olacabs.com/",
-    "https://www.bookmyshow.com/",
-    "https://www.makemytrip.com/",
-    "https://www.goibibo.com/",
-    "https://www.cleartrip.com/",
-    "https://www.redbus.in/",
-    "https://www.irctc.co.in/",
-    "https://www.phonepe.com/",
-    "https://www.gpay.com/",
-    "https://www.razorpay.com/",
-    "https://www.cred.com/",
-    "https://www.groww.in/",
-    "https://www.zerodha.com/",
-    "https://www.upstox.com/",
-    "https://www.byjus.com/",
-    "https://www.vedantu.com/",
-    "https://www.unacademy.com/",
-    "https://www.coursera.org/",
-]
+# Test URLs - mix of different domains, one per line
+TEST_URLS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_urls.txt")
 
 
 async def main():
     print(f"\n{'='*80}")
-    print(f"BATCH PROCESSING TEST - {len(TEST_URLS)} URLs")
+    print(f"BATCH PROCESSING TEST - {TEST_URLS_FILE}")
     print(f"{'='*80}\n")
     
     # Create configuration with all 13 services
@@ -162,39 +58,41 @@ async def main():
     
     try:
         # Process batch
-        result = await async_fetch_batch(TEST_URLS, config)
+        result = await async_fetch_batch(iter_urls(TEST_URLS_FILE), config)
         
-        # Display results
-        print(f"\n{'='*80}")
-        print("FINAL RESULTS")
-        print(f"{'='*80}\n")
+        # Display results (buffered and written once)
+        lines = []
+        lines.append(f"\n{'='*80}")
+        lines.append("FINAL RESULTS")
+        lines.append(f"{'='*80}\n")
         
         summary = result["summary"]
-        print(f"Total URLs: {summary['total']}")
-        print(f"✅ Successful: {summary['success']}")
-        print(f"❌ Failed: {summary['failed']}")
-        print(f"\nBy Method:")
+        lines.append(f"Total URLs: {summary['total']}")
+        lines.append(f"✅ Successful: {summary['success']}")
+        lines.append(f"❌ Failed: {summary['failed']}")
+        lines.append(f"\nBy Method:")
         for method, count in summary['by_method'].items():
-            print(f"  - {method}: {count}")
-        print(f"\nJS Batches Processed: {summary['js_batches_processed']}")
-        print(f"Decodo Fallback Count: {summary['decodo_fallback_count']}")
-        print(f"Total Time: {summary['total_time']:.2f} seconds")
-        print(f"Average Time per URL: {summary['total_time']/summary['total']:.2f} seconds")
+            lines.append(f"  - {method}: {count}")
+        lines.append(f"\nJS Batches Processed: {summary['js_batches_processed']}")
+        lines.append(f"Decodo Fallback Count: {summary['decodo_fallback_count']}")
+        lines.append(f"Total Time: {summary['total_time']:.2f} seconds")
+        lines.append(f"Average Time per URL: {summary['total_time']/summary['total']:.2f} seconds")
         
-        # Show failed URLs
-        failed = [r for r in result["results"] if r["status"] == "failed"]
-        if failed:
-            print(f"\n{'='*80}")
-            print(f"FAILED URLs ({len(failed)}):")
-            print(f"{'='*80}")
+        # Show failed URLs (the summary has the count, so only scan when there are any)
+        if summary["failed"]:
+            failed = [r for r in result["results"] if r["status"] == "failed"]
+            lines.append(f"\n{'='*80}")
+            lines.append(f"FAILED URLs ({len(failed)}):")
+            lines.append(f"{'='*80}")
             for r in failed:
-                print(f"  - {r['url']}")
-                print(f"    Method: {r['method'] or 'N/A'}")
-                print(f"    Error: {r['error']}")
+                lines.append(f"  - {r['url']}")
+                lines.append(f"    Method: {r['method'] or 'N/A'}")
+                lines.append(f"    Error: {r['error']}")
         
-        print(f"\n{'='*80}")
-        print("TEST COMPLETED")
-        print(f"{'='*80}\n")
+        lines.append(f"\n{'='*80}")
+        lines.append("TEST COMPLETED")
+        lines.append(f"{'='*80}\n")
+        sys.stdout.write("\n".join(lines) + "\n")
         
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
@@ -203,5 +101,10 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    setup_event_loop()
+    log_listener.start()
+    try:
+        asyncio.run(main())
+    finally:
+        log_listener.stop()
 
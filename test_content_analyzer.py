@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check that ContentAnalyzer measures pages the same way with either parser.
+
+Skeleton detection uses selectolax when it is installed and BeautifulSoup
+otherwise; both must produce identical metrics for the verdict to be stable.
+Needs selectolax (skipped without it); runs under pytest or directly.
+"""
+
+import pytest
+
+from url_to_html import content_analyzer
+from url_to_html.content_analyzer import ContentAnalyzer
+
+# Well-formed sample pages (both parsers build the same tree for these)
+SAMPLE_PAGES = [
+    "<div><span>Item</span></div><p> </p>" * 6,
+    "<!DOCTYPE html><html><head><title>Shop</title>"
+    "<style>.a { color: red }</style><script>var x = 1;</script></head><body>"
+    + "".join(
+        f"<div class='card'><p>Product {i} description text</p>"
+        f"<a href='/p/{i}'>View</a><img src='/img/{i}.png'><div></div></div>"
+        for i in range(30)
+    )
+    + "</body></html>",
+    "<html><body><div id='root'></div><noscript>You need to enable JavaScript</noscript></body></html>",
+    "<html><body><section><article><p>Nested <b>bold</b> text</p></article></section>"
+    "<div><!-- comment only --></div><div>\n  <span>spaced</span>\n</div>"
+    "<a>no href</a><img alt='no src'><p>café   naïve</p></body></html>",
+    "<html><body><div class='loading skeleton'></div>"
+    "<template><p>Hidden template text</p></template>"
+    "<ruby>漢<rt>kan</rt></ruby><p>Visible</p></body></html>",
+    "<html><body><div><template>only child</template></div>"
+    "<div>text<template><p>inside</p></template></div></body></html>",
+]
+
+
+def _metrics_with(parser, html):
+    """Measure html with LexborHTMLParser temporarily set to parser (None for bs4)."""
+    saved = content_analyzer.LexborHTMLParser
+    content_analyzer.LexborHTMLParser = parser
+    try:
+        return ContentAnalyzer()._page_metrics(html)
+    finally:
+        content_analyzer.LexborHTMLParser = saved
+
+
+@pytest.mark.parametrize("html", SAMPLE_PAGES)
+@pytest.mark.parametrize("encode", [False, True])
+def test_backends_agree(html, encode):
+    pytest.importorskip("selectolax")
+    lexbor = content_analyzer.LexborHTMLParser
+    page = html.encode('utf-8') if encode else html
+    assert _metrics_with(lexbor, page) == _metrics_with(None, page)
+
+
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-q"]))
@@ -2,15 +2,21 @@
 """
 Test script to process 10 URLs in parallel using JSrend.
 
-This demonstrates parallel processing with the current synchronous code
-using ThreadPoolExecutor. Includes rate limiting to avoid 429 errors.
+Every URL is a coroutine on one event loop; each one runs the library's
+blocking JSrend call on a worker thread, and the pool is sized so at most
+MAX_CONCURRENT renders are in flight to avoid 429 errors.
 """
 
+import asyncio
+import logging
+import queue
+import sys
 import time
-import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Semaphore
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import NamedTuple, Optional
 from url_to_html.js_renderer import JSrend
+from url_to_html.batch_config import setup_event_loop
 
 # Test URLs - replace with your actual URLs
 TEST_URLS = [
@@ -26,53 +32,61 @@ TEST_URLS = [
     "https://www.bigbasket.com/",
 ]
 
-# Semaphore to limit concurrent requests (rate limiting)
+# Limit concurrent requests (rate limiting)
 # IMPORTANT: Decodo can only process 3 URLs concurrently at a time
 MAX_CONCURRENT = 3  # Decodo's limit - do not exceed
-request_semaphore = Semaphore(MAX_CONCURRENT)
 
-def process_url(url: str, delay: float = 0) -> dict:
+# Per-URL progress lines are queued on the event loop and written by a listener thread
+_progress_queue = queue.SimpleQueue()
+progress = logging.getLogger("test_parallel_js")
+progress.setLevel(logging.INFO)
+progress.propagate = False
+progress.addHandler(QueueHandler(_progress_queue))
+progress_listener = QueueListener(_progress_queue, logging.StreamHandler(sys.stdout))
+
+
+class Result(NamedTuple):
+    """Outcome of rendering one URL."""
+    url: str
+    status: str
+    html_length: int
+    elapsed_time: float
+    error: Optional[str]
+
+
+async def process_url(executor: ThreadPoolExecutor, url: str) -> Result:
     """
-    Process a single URL and return result.
+    Render a single URL with JSrend and return result.
     
     Args:
+        executor: Worker threads (MAX_CONCURRENT of them) that run JSrend
         url: URL to process
-        delay: Delay before starting (to stagger requests)
     """
-    # Stagger requests to avoid hitting rate limits
-    if delay > 0:
-        time.sleep(delay)
-    
-    # Acquire semaphore to limit concurrent requests
-    request_semaphore.acquire()
-    start_time = time.time()
-    
-    try:
-        html = JSrend(url)
-        elapsed = time.time() - start_time
-        result = {
-            "url": url,
-            "status": "success",
-            "html_length": len(html),
-            "elapsed_time": elapsed,
-            "error": None
-        }
-    except Exception as e:
-        elapsed = time.time() - start_time
-        result = {
-            "url": url,
-            "status": "failed",
-            "html_length": 0,
-            "elapsed_time": elapsed,
-            "error": str(e)
-        }
-    finally:
-        # Release semaphore
-        request_semaphore.release()
-    
-    return result
+    loop = asyncio.get_running_loop()
+    # Timed on the worker thread, so time spent queued for a slot isn't counted
+    def render():
+        start_time = time.time()
+        try:
+            html = JSrend(url)
+            return Result(
+                url=url,
+                status="success",
+                html_length=len(html),
+                elapsed_time=time.time() - start_time,
+                error=None
+            )
+        except Exception as e:
+            return Result(
+                url=url,
+                status="failed",
+                html_length=0,
+                elapsed_time=time.time() - start_time,
+                error=str(e) or type(e).__name__
+            )
+    return await loop.run_in_executor(executor, render)
+
 
-def main():
+async def main():
     print(f"Processing {len(TEST_URLS)} URLs in parallel...")
     print(f"Max concurrent requests: {MAX_CONCURRENT}")
     print("=" * 80)
@@ -80,54 +94,60 @@ def main():
     start_time = time.time()
     results = []
     
-    # Stagger requests with small random delays to avoid rate limits
-    delays = [random.uniform(0, 0.5) * i for i in range(len(TEST_URLS))]
-    
-    # Process URLs in parallel using ThreadPoolExecutor
-    # Limit workers to MAX_CONCURRENT to respect rate limits
     with ThreadPoolExecutor(max_workers=MAX_CONCURRENT) as executor:
-        # Submit all tasks with staggered delays
-        future_to_url = {
-            executor.submit(process_url, url, delay): url 
-            for url, delay in zip(TEST_URLS, delays)
-        }
+        tasks = [process_url(executor, url) for url in TEST_URLS]
         
         # Process completed tasks as they finish
-        for future in as_completed(future_to_url):
-            result = future.result()
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
             results.append(result)
             
-            status_icon = "✓" if result["status"] == "success" else "✗"
-            print(f"{status_icon} {result['url'][:50]:<50} | "
-                  f"Status: {result['status']:<8} | "
-                  f"Size: {result['html_length']:>8} bytes | "
-                  f"Time: {result['elapsed_time']:.2f}s")
+            status_icon = "✓" if result.status == "success" else "✗"
+            progress.info(f"{status_icon} {result.url[:50]:<50} | "
+                          f"Status: {result.status:<8} | "
+                          f"Size: {result.html_length:>8} bytes | "
+                          f"Time: {result.elapsed_time:.2f}s")
     
     total_time = time.time() - start_time
     
-    # Summary
-    print("\n" + "=" * 80)
-    print("SUMMARY")
-    print("=" * 80)
-    successful = sum(1 for r in results if r["status"] == "success")
+    # Summary (buffered and emitted once)
+    lines = []
+    lines.append("\n" + "=" * 80)
+    lines.append("SUMMARY")
+    lines.append("=" * 80)
+    # Classify and total in one pass
+    successful = 0
+    total_elapsed = 0.0
+    errors = []
+    for r in results:
+        total_elapsed += r.elapsed_time
+        if r.status == "success":
+            successful += 1
+        if r.error:
+            errors.append(r)
     failed = len(results) - successful
-    avg_time = sum(r["elapsed_time"] for r in results) / len(results)
+    avg_time = total_elapsed / len(results)
     
-    print(f"Total URLs: {len(results)}")
-    print(f"Successful: {successful}")
-    print(f"Failed: {failed}")
-    print(f"Total time: {total_time:.2f}s")
-    print(f"Average time per URL: {avg_time:.2f}s")
-    print(f"Throughput: {len(results)/total_time:.2f} URLs/second")
-    print("=" * 80)
+    lines.append(f"Total URLs: {len(results)}")
+    lines.append(f"Successful: {successful}")
+    lines.append(f"Failed: {failed}")
+    lines.append(f"Total time: {total_time:.2f}s")
+    lines.append(f"Average time per URL: {avg_time:.2f}s")
+    lines.append(f"Throughput: {len(results)/total_time:.2f} URLs/second")
+    lines.append("=" * 80)
     
     # Show errors if any
-    errors = [r for r in results if r["error"]]
     if errors:
-        print("\nERRORS:")
+        lines.append("\nERRORS:")
         for r in errors:
-            print(f"  - {r['url']}: {r['error']}")
+            lines.append(f"  - {r.url}: {r.error}")
+    # One record through the same queue, so it lands after the progress lines
+    progress.info("\n".join(lines))
 
 if __name__ == "__main__":
-    main()
-
+    setup_event_loop()
+    progress_listener.start()
+    try:
+        asyncio.run(main())
+    finally:
+        progress_listener.stop()
@@ -15,15 +15,16 @@ except ImportError:
 
 from .fetcher import fetch_html, FetcherConfig
 from .js_renderer import JSrend
-from .async_batch_fetcher import async_fetch_batch
-from .batch_config import BatchFetcherConfig
+from .async_batch_fetcher import async_fetch_batch, iter_urls
+from .batch_config import BatchFetcherConfig, setup_event_loop
 from .exceptions import (
     FetchError,
     BlockedError,
     SkeletonContentError,
     TimeoutError,
     InvalidURLError,
-    JSRenderError
+    JSRenderError,
+    ResponseTooLargeError
 )
 
 __version__ = "0.1.0"
@@ -31,13 +32,16 @@ __all__ = [
     "fetch_html",
     "JSrend",
     "async_fetch_batch",
+    "iter_urls",
     "FetcherConfig",
     "BatchFetcherConfig",
+    "setup_event_loop",
     "FetchError",
     "BlockedError",
     "SkeletonContentError",
     "TimeoutError",
     "InvalidURLError",
     "JSRenderError",
+    "ResponseTooLargeError",
 ]
 
@@ -3,9 +3,12 @@ Main async batch fetcher that orchestrates all three phases.
 """
 
 import logging
+import asyncio
+import gzip
 import time
 import os
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Optional
 from urllib.parse import urlparse
 from .async_static_xhr_processor import AsyncStaticXHRProcessor
 from .async_multi_service_js_renderer import AsyncMultiServiceJSRenderer
@@ -14,18 +17,39 @@ from .result_aggregator import ResultAggregator
 from .batch_config import BatchFetcherConfig
 from .content_analyzer import ContentAnalyzer
 
+try:
+    import zstandard
+except ImportError:
+    # zstandard not installed, "zstd" output compression is unavailable
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# URL punctuation that becomes '_' in output filenames
+_URL_PUNCT_TRANS = str.maketrans({'.': '_', '/': '_', '&': '_', '=': '_'})
+
 
-def _save_html_to_file(html_content: str, url: str, method: str, output_dir: str = "outputs") -> str:
-    """Save HTML content to a file for verification."""
+def _save_html_to_file(
+    html_content: str,
+    url: str,
+    method: str,
+    output_dir: str = "outputs",
+    compression: Optional[str] = None
+) -> str:
+    """
+    Save HTML content to a file for verification.
+    
+    compression may be "gzip" (.html.gz) or "zstd" (.html.zst, needs
+    zstandard); None writes plain .html.
+    """
+    # Checked on every write (one stat when it exists), so a directory
+    # removed mid-run is recreated instead of failing later saves
     os.makedirs(output_dir, exist_ok=True)
     
-    from urllib.parse import urlparse
     parsed = urlparse(url)
-    domain = parsed.netloc.replace('.', '_')
-    path = parsed.path.replace('/', '_').strip('_') or 'index'
-    query = parsed.query.replace('&', '_').replace('=', '_') if parsed.query else ''
+    domain = parsed.netloc.translate(_URL_PUNCT_TRANS)
+    path = parsed.path.translate(_URL_PUNCT_TRANS).strip('_') or 'index'
+    query = parsed.query.translate(_URL_PUNCT_TRANS) if parsed.query else ''
     
     filename_base = f"{domain}_{path}"
     if query:
@@ -39,8 +63,18 @@ def _save_html_to_file(html_content: str, url: str, method: str, output_dir: str
     filepath = os.path.join(output_dir, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        if compression == "zstd":
+            filepath += ".zst"
+            compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+            with open(filepath, 'wb') as f:
+                f.write(compressor.compress(html_content.encode('utf-8')))
+        elif compression == "gzip":
+            filepath += ".gz"
+            with gzip.open(filepath, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(html_content)
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(html_content)
         logger.debug(f"Saved {method} output to: {filepath}")
         return filepath
     except Exception as e:
@@ -48,6 +82,73 @@ def _save_html_to_file(html_content: str, url: str, method: str, output_dir: str
         return ""
 
 
+class _OutputWriter:
+    """
+    Single-writer queue for saving HTML outputs.
+    
+    Producers enqueue without blocking the event loop; one consumer task
+    writes the files one at a time from the default executor.
+    """
+    
+    def __init__(self, output_dir: str, enabled: bool = True, compression: Optional[str] = None):
+        """
+        Initialize the writer.
+        
+        Raises:
+            ValueError: If compression is not "gzip", "zstd" or None
+            ImportError: If compression is "zstd" and zstandard is not installed
+        """
+        if enabled:
+            if compression not in (None, "gzip", "zstd"):
+                raise ValueError(f"Unknown output_compression {compression!r}; use 'gzip', 'zstd' or None")
+            if compression == "zstd" and zstandard is None:
+                # Fail up front rather than write files that don't match the setting
+                raise ImportError("output_compression='zstd' requires zstandard (pip install url-to-html[zstd])")
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.compression = compression
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def submit(self, html_content: str, url: str, method: str):
+        """Queue html_content for saving (no-op when saving is disabled)."""
+        if not self.enabled:
+            return
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.ensure_future(self._run())
+        self._queue.put_nowait((html_content, url, method))
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                break
+            html_content, url, method = item
+            await loop.run_in_executor(
+                None, _save_html_to_file, html_content, url, method,
+                self.output_dir, self.compression
+            )
+    
+    async def close(self):
+        """Wait for queued writes to finish and stop the writer task."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+
+def iter_urls(path: str) -> Iterator[str]:
+    """Yield URLs from a text file one per line, skipping blanks and # comments."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
 def _extract_hostname(url: str) -> str:
     """Return normalized hostname (without www.) from URL."""
     parsed = urlparse(url)
@@ -69,8 +170,9 @@ def _should_skip_custom_js(url: str, excluded_domains: Optional[List[str]]) -> b
 
 
 async def async_fetch_batch(
-    urls: List[str],
-    config: Optional[BatchFetcherConfig] = None
+    urls: Iterable[str],
+    config: Optional[BatchFetcherConfig] = None,
+    chunk_size: Optional[int] = None
 ) -> Dict[str, any]:
     """
     Process a batch of URLs with three-tier fallback strategy.
@@ -81,8 +183,11 @@ async def async_fetch_batch(
     3. Phase 3: Decodo fallback (3 concurrent, only for failed URLs)
     
     Args:
-        urls: List of URLs to process
+        urls: URLs to process (any iterable, e.g. iter_urls(path))
         config: BatchFetcherConfig instance (optional)
+        chunk_size: If set, pull this many URLs at a time from urls and run
+            all three phases on each chunk before reading the next, so
+            the input is never fully materialized
         
     Returns:
         Dictionary with results and summary
@@ -98,7 +203,58 @@ async def async_fetch_batch(
     
     start_time = time.time()
     aggregator = ResultAggregator()
+    writer = _OutputWriter(
+        config.output_dir,
+        enabled=config.save_outputs,
+        compression=config.output_compression
+    )
+    if chunk_size is None:
+        chunks = [list(urls)]
+    else:
+        url_iter = iter(urls)
+        chunks = iter(lambda: list(islice(url_iter, chunk_size)), [])
+    
+    # One processor (and connection pool) for every chunk's Phase 1
+    static_xhr_processor = AsyncStaticXHRProcessor(
+        timeout=config.static_xhr_timeout,
+        headers=config.static_xhr_headers,
+        max_concurrent=config.static_xhr_concurrency,
+        limit_per_host=config.static_xhr_per_host,
+        replica_nameservers=config.dns_replica_nameservers
+    )
+    
+    try:
+        async with static_xhr_processor:
+            for chunk in chunks:
+                await _run_phases(chunk, config, writer, aggregator, static_xhr_processor)
+    finally:
+        # Flush queued outputs before returning
+        await writer.close()
+    
+    # Final summary
+    total_time = time.time() - start_time
+    final_result = aggregator.get_final_result(total_time)
+    
+    logger.info("=" * 80)
+    logger.info("BATCH PROCESSING COMPLETED")
+    logger.info("=" * 80)
+    logger.info(f"Total URLs: {final_result['summary']['total']}")
+    logger.info(f"Successful: {final_result['summary']['success']}")
+    logger.info(f"Failed: {final_result['summary']['failed']}")
+    logger.info(f"By method: {final_result['summary']['by_method']}")
+    logger.info(f"Total time: {final_result['summary']['total_time']:.2f}s")
     
+    return final_result
+
+
+async def _run_phases(
+    urls: List[str],
+    config: BatchFetcherConfig,
+    writer: _OutputWriter,
+    aggregator: ResultAggregator,
+    static_xhr_processor: AsyncStaticXHRProcessor
+):
+    """Run the three fetch phases for urls, recording results on aggregator."""
     logger.info(f"Starting batch processing for {len(urls)} URLs")
     
     # Phase 1: Static + XHR Processing
@@ -106,12 +262,6 @@ async def async_fetch_batch(
     logger.info("PHASE 1: Static + XHR Processing")
     logger.info("=" * 80)
     
-    static_xhr_processor = AsyncStaticXHRProcessor(
-        timeout=config.static_xhr_timeout,
-        headers=config.static_xhr_headers,
-        max_concurrent=config.static_xhr_concurrency
-    )
-    
     phase1_results = await static_xhr_processor.process_batch(urls)
     
     # Separate successful and URLs needing JS rendering
@@ -124,13 +274,8 @@ async def async_fetch_batch(
         else:
             successful_urls.append(result)
             # Save output if configured
-            if config.save_outputs and result["html"]:
-                _save_html_to_file(
-                    result["html"],
-                    result["url"],
-                    result["method"],
-                    config.output_dir
-                )
+            if result["html"]:
+                writer.submit(result["html"], result["url"], result["method"])
     
     # Add successful results to aggregator
     for result in successful_urls:
@@ -158,8 +303,7 @@ async def async_fetch_batch(
     
     if not js_urls and not decodo_direct_urls:
         # All URLs succeeded in Phase 1
-        total_time = time.time() - start_time
-        return aggregator.get_final_result(total_time)
+        return
     
     custom_js_successful = []
     phase2_results = []
@@ -176,7 +320,8 @@ async def async_fetch_batch(
             service_endpoints=config.custom_js_service_endpoints,
             batch_size=config.custom_js_batch_size,
             cooldown_seconds=config.custom_js_cooldown_seconds,
-            timeout=config.custom_js_timeout
+            timeout=config.custom_js_timeout,
+            replica_nameservers=config.dns_replica_nameservers
         )
         
         logger.info(f"Using {len(config.custom_js_service_endpoints)} services for parallel processing")
@@ -218,13 +363,8 @@ async def async_fetch_batch(
                     logger.debug(f"Custom JS success for {result['url']} on attempt {attempt}")
                     
                     # Save output if configured
-                    if config.save_outputs and result["html"]:
-                        _save_html_to_file(
-                            result["html"],
-                            result["url"],
-                            "custom_js",
-                            config.output_dir
-                        )
+                    if result["html"]:
+                        writer.submit(result["html"], result["url"], "custom_js")
                 else:
                     # Failed, add to retry list
                     logger.debug(f"Custom JS failed for {result['url']} on attempt {attempt}: {result.get('error', 'Unknown error')}")
@@ -270,8 +410,7 @@ async def async_fetch_batch(
                     status="failed",
                     error=result["error"]
                 )
-        total_time = time.time() - start_time
-        return aggregator.get_final_result(total_time)
+        return
     
     if not config.decodo_enabled:
         # Decodo disabled - mark remaining URLs as failed
@@ -293,8 +432,7 @@ async def async_fetch_batch(
                 status="failed",
                 error="Decodo fallback disabled"
             )
-        total_time = time.time() - start_time
-        return aggregator.get_final_result(total_time)
+        return
     
     # Phase 3: Decodo Fallback (only for failed URLs)
     logger.info("=" * 80)
@@ -328,28 +466,7 @@ async def async_fetch_batch(
         )
         
         # Save output if successful and configured
-        if result["status"] == "success" and config.save_outputs and result["html"]:
-            _save_html_to_file(
-                result["html"],
-                result["url"],
-                "decodo",
-                config.output_dir
-            )
+        if result["status"] == "success" and result["html"]:
+            writer.submit(result["html"], result["url"], "decodo")
     
     logger.info(f"Phase 3 completed: {len(phase3_results)} URLs processed")
-    
-    # Final summary
-    total_time = time.time() - start_time
-    final_result = aggregator.get_final_result(total_time)
-    
-    logger.info("=" * 80)
-    logger.info("BATCH PROCESSING COMPLETED")
-    logger.info("=" * 80)
-    logger.info(f"Total URLs: {final_result['summary']['total']}")
-    logger.info(f"Successful: {final_result['summary']['success']}")
-    logger.info(f"Failed: {final_result['summary']['failed']}")
-    logger.info(f"By method: {final_result['summary']['by_method']}")
-    logger.info(f"Total time: {final_result['summary']['total_time']:.2f}s")
-    
-    return final_result
-
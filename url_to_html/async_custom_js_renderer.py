@@ -1,16 +1,46 @@
 """
 Async batch processor for custom JS rendering service.
-Processes URLs in batches of 20 with 2-minute cooldown between batches.
+Processes URLs in batches of 20, rate limited to one batch's worth of URLs
+per 2-minute cooldown window.
 """
 
 import logging
 import asyncio
+import json
+import random
 import aiohttp
-from typing import List, Dict, Optional
+from aiolimiter import AsyncLimiter
+from collections import defaultdict, deque
+from typing import List, Dict, Optional, AsyncIterator, Tuple
 from .exceptions import JSRenderError
+from .dynamic_limiter import DynamicLimiter
+from .dns_resolver import build_resolver, DNS_CACHE_TTL
+
+try:
+    import orjson
+except ImportError:
+    # orjson not installed, use the standard library json module
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Upstream statuses worth resending a batch for
+RETRYABLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize a request payload to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Deserialize a JSON response body."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class AsyncCustomJSRenderer:
     """Batch processor for custom JS rendering service."""
@@ -20,7 +50,13 @@ class AsyncCustomJSRenderer:
         api_url: str = "https://chromeworkers-copy-production.up.railway.app/render",
         batch_size: int = 20,
         cooldown_seconds: int = 120,  # 2 minutes
-        timeout: int = 300  # 5 minutes for batch processing
+        timeout: int = 300,  # 5 minutes for batch processing
+        max_concurrent_batches: int = 2,
+        max_retries: int = 3,
+        task_submit_url: Optional[str] = None,
+        task_results_url: Optional[str] = None,
+        poll_interval: float = 2.0,
+        max_poll_wait: float = 180.0
     ):
         """
         Initialize the custom JS renderer.
@@ -28,124 +64,464 @@ class AsyncCustomJSRenderer:
         Args:
             api_url: Custom JS rendering API endpoint
             batch_size: Number of URLs to process per batch (default: 20)
-            cooldown_seconds: Seconds to wait after each batch (default: 120 = 2 minutes)
+            cooldown_seconds: Rate window; at most batch_size URLs are
+                submitted per window (default: 120 = 2 minutes)
             timeout: Request timeout in seconds
+            max_concurrent_batches: Max batches in flight at once (default: 2)
+            max_retries: Times a batch is resent after a 429/5xx or connection
+                error before its remaining URLs are failed (default: 3)
+            task_submit_url: Batch task endpoint (``/v2/task/batch`` style). When
+                set, all URLs are submitted in one request and polled per task
+                instead of being split into rate-limited batches
+            task_results_url: Per-task results URL with a ``{task_id}`` placeholder
+            poll_interval: Initial delay between result polls in seconds
+            max_poll_wait: Max seconds to poll a single task before failing it
         """
         self.api_url = api_url
         self.batch_size = batch_size
         self.cooldown_seconds = cooldown_seconds
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_concurrent_batches = max_concurrent_batches
+        self.max_retries = max_retries
+        self.task_submit_url = task_submit_url
+        self.task_results_url = task_results_url
+        self.poll_interval = poll_interval
+        self.max_poll_wait = max_poll_wait
+        if task_submit_url and not task_results_url:
+            raise ValueError("task_results_url is required when task_submit_url is set")
+        # Token bucket shared by all process_urls calls: batch_size URLs per window
+        self._limiter = AsyncLimiter(max_rate=batch_size, time_period=cooldown_seconds)
+        # In-flight batch cap; halves on 429/5xx and grows back on clean responses
+        self._admission = DynamicLimiter(max_concurrent_batches)
+        # Created on first use and kept for the renderer's lifetime
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._resolver = None
     
-    async def _process_batch(
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the renderer's session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # Keep connections to the render host alive across calls and cache DNS
+            self._resolver = build_resolver()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent_batches,
+                limit_per_host=self.max_concurrent_batches,
+                keepalive_timeout=75,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                resolver=self._resolver,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(timeout=self.timeout, connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Close the session and resolver (cleanup)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._resolver is not None:
+            await self._resolver.close()
+            self._resolver = None
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+    
+    async def _adjust_concurrency(self, status: int):
+        """Back off on upstream pressure, recover gradually on success."""
+        if status == 429 or status >= 500:
+            await self._admission.resize(self._admission.limit // 2)
+        elif status == 200:
+            await self._admission.resize(self._admission.limit + 1)
+    
+    @staticmethod
+    def _retry_after(header: Optional[str], attempt: int) -> float:
+        """Seconds to wait before a retry: Retry-After if given, else backoff with jitter."""
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        return 2 ** attempt + random.random()
+    
+    @staticmethod
+    def _normalize_result(result: Dict[str, any], url: str) -> Dict[str, any]:
+        """Convert an upstream per-URL result for input URL url into our result format."""
+        return {
+            "url": url,
+            "html": result.get("html") if result.get("status") == "success" else None,
+            "status": result.get("status", "failed"),
+            "error": result.get("error") if result.get("status") != "success" else None
+        }
+    
+    @staticmethod
+    def _failed_results(urls, error: str) -> List[Dict[str, any]]:
+        """Build failed results for every URL in urls."""
+        return [
+            {
+                "url": url,
+                "html": None,
+                "status": "failed",
+                "error": error
+            }
+            for url in urls
+        ]
+    
+    @staticmethod
+    async def _iter_sse_data(content: aiohttp.StreamReader) -> AsyncIterator[bytes]:
+        """
+        Yield the payload of each SSE ``data:`` line.
+        
+        Lines are split from raw chunks rather than with readline, because a
+        single event carries a whole HTML page and can exceed aiohttp's line
+        length limit.
+        """
+        buffer = bytearray()
+        async for chunk in content.iter_any():
+            scan_from = len(buffer)
+            buffer.extend(chunk)
+            line_start = 0
+            while True:
+                newline = buffer.find(b'\n', scan_from)
+                if newline < 0:
+                    break
+                line = bytes(buffer[line_start:newline]).strip()
+                if line.startswith(b'data:'):
+                    yield line[5:]
+                line_start = scan_from = newline + 1
+            del buffer[:line_start]
+        
+        line = bytes(buffer).strip()
+        if line.startswith(b'data:'):
+            yield line[5:]
+    
+    async def _stream_batch(
         self,
         session: aiohttp.ClientSession,
         urls: List[str],
         batch_num: int
-    ) -> List[Dict[str, any]]:
+    ) -> AsyncIterator[Tuple[int, Dict[str, any]]]:
         """
-        Process a single batch of URLs.
+        Process a single batch of URLs, yielding results as they arrive.
+        
+        The service is asked for Server-Sent Events (one ``data: {...}`` event
+        per URL). If it answers with plain JSON instead, the whole body is
+        parsed and its results yielded. On 429/5xx or a connection error the
+        URLs not yet reported are resent, up to max_retries times, waiting for
+        Retry-After or an exponential backoff with jitter. URLs the upstream
+        never reported are yielded as failed at the end.
+        
+        Every position in urls gets exactly one result, carrying that input
+        URL even when the upstream reported a redirected or normalized one.
         
         Args:
             session: aiohttp session
             urls: List of URLs to process (up to batch_size)
             batch_num: Batch number for logging
             
-        Returns:
-            List of result dictionaries
+        Yields:
+            (position in urls, result dictionary) tuples
         """
         logger.info(f"Processing JS rendering batch {batch_num} with {len(urls)} URLs")
         
-        try:
-            payload = {"urls": urls}
+        # Input positions still waiting for a result
+        pending: Dict[int, str] = dict(enumerate(urls))
+        successful = failed = 0
+        error = None
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                logger.info(
+                    f"Retrying JS rendering batch {batch_num} ({len(pending)} URLs), "
+                    f"attempt {attempt + 1}/{self.max_retries + 1}"
+                )
+            retry_after = None
+            # Only resend URLs the upstream has not reported yet
+            sent = list(pending)
+            try:
+                payload = {"urls": [urls[position] for position in sent]}
+                
+                async with session.post(
+                    self.api_url,
+                    data=_json_dumps(payload),
+                    headers={
+                        'Content-Type': 'application/json',
+                        'Accept': 'text/event-stream, application/json'
+                    }
+                ) as response:
+                    await self._adjust_concurrency(response.status)
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logger.error(f"JS rendering API returned status {response.status}: {error_text}")
+                        error = f"API returned status {response.status}: {error_text[:200]}"
+                        if response.status not in RETRYABLE_STATUSES:
+                            break
+                        retry_after = self._retry_after(response.headers.get('Retry-After'), attempt)
+                    
+                    elif response.content_type == 'text/event-stream':
+                        # Events arrive in completion order, so each is matched to
+                        # a sent URL by name; events reported under another name
+                        # are matched by position once the stream ends
+                        waiting = defaultdict(deque)
+                        for position in sent:
+                            waiting[urls[position]].append(position)
+                        unmatched = []
+                        async for data in self._iter_sse_data(response.content):
+                            try:
+                                event = _json_loads(data)
+                            except ValueError:
+                                continue  # keep-alive or end-of-stream marker
+                            if not isinstance(event, dict) or "url" not in event:
+                                continue
+                            positions = waiting.get(event["url"])
+                            if not positions:
+                                unmatched.append(event)
+                                continue
+                            position = positions.popleft()
+                            result = self._normalize_result(event, urls[position])
+                            del pending[position]
+                            if result["status"] == "success":
+                                successful += 1
+                            else:
+                                failed += 1
+                            yield position, result
+                        for position, event in zip([p for p in sent if p in pending], unmatched):
+                            result = self._normalize_result(event, urls[position])
+                            del pending[position]
+                            if result["status"] == "success":
+                                successful += 1
+                            else:
+                                failed += 1
+                            yield position, result
+                        # A completed stream is final; unreported URLs are failed below
+                        error = "No result returned by API"
+                        break
+                    else:
+                        data = _json_loads(await response.read())
+                        
+                        if "results" not in data:
+                            # Unexpected response format
+                            logger.warning(f"Unexpected response format from JS rendering API")
+                            error = "Unexpected response format from API"
+                            break
+                        
+                        # The JSON API answers in request order
+                        for position, item in zip(sent, data["results"]):
+                            result = self._normalize_result(item, urls[position])
+                            del pending[position]
+                            if result["status"] == "success":
+                                successful += 1
+                            else:
+                                failed += 1
+                            yield position, result
+                        # A short results list is final; unreported URLs are failed below
+                        error = "No result returned by API"
+                        break
+                    
+            except asyncio.TimeoutError:
+                logger.error(f"JS rendering batch {batch_num} timed out")
+                error = "Request timeout"
+            except Exception as e:
+                logger.error(f"JS rendering batch {batch_num} failed: {e}")
+                error = str(e) or type(e).__name__
             
+            if not pending or attempt == self.max_retries:
+                break
+            if retry_after is None:
+                retry_after = self._retry_after(None, attempt)
+            await asyncio.sleep(retry_after)
+        
+        for position, url in pending.items():
+            yield position, self._failed_results([url], error or "No result returned by API")[0]
+        failed += len(pending)
+        
+        logger.info(f"Batch {batch_num} completed: {successful} successful, {failed} failed")
+    
+    @staticmethod
+    def _parse_task_ids(data, urls: List[str]) -> Dict[str, int]:
+        """
+        Map task ids from a batch submission response to positions in urls.
+        
+        Accepts ``{"queries": [...]}``, ``{"tasks": [...]}`` or a bare list of
+        task entries or ids. Entries are matched by URL, or by their own
+        position when they carry none or a URL that was not submitted.
+        """
+        if isinstance(data, dict):
+            entries = data.get("queries") or data.get("tasks") or []
+        elif isinstance(data, list):
+            entries = data
+        else:
+            entries = []
+        
+        waiting = defaultdict(deque)
+        for position, url in enumerate(urls):
+            waiting[url].append(position)
+        claimed = set()
+        task_map = {}
+        for index, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                task_id = entry.get("id") or entry.get("task_id") or entry.get("query_id")
+                url = entry.get("url") or entry.get("query")
+            else:
+                task_id, url = entry, None
+            if not task_id:
+                continue
+            positions = waiting.get(url)
+            while positions and positions[0] in claimed:
+                positions.popleft()
+            if positions:
+                position = positions.popleft()
+            elif index < len(urls) and index not in claimed:
+                position = index
+            else:
+                continue
+            claimed.add(position)
+            task_map[str(task_id)] = position
+        return task_map
+    
+    @staticmethod
+    def _normalize_task_result(url: str, data) -> Dict[str, any]:
+        """Convert a polled task result into our result format."""
+        if isinstance(data, dict) and data.get("results"):
+            data = data["results"][0]
+        if not isinstance(data, dict):
+            return {"url": url, "html": None, "status": "failed", "error": "Unexpected task result format"}
+        html = data.get("html") or data.get("content")
+        if html:
+            return {"url": url, "html": html, "status": "success", "error": None}
+        return {
+            "url": url,
+            "html": None,
+            "status": "failed",
+            "error": data.get("error") or "No HTML content returned"
+        }
+    
+    async def _poll_task(
+        self,
+        session: aiohttp.ClientSession,
+        task_id: str,
+        url: str
+    ) -> Dict[str, any]:
+        """Poll one task until it has a result, backing off between attempts."""
+        results_url = self.task_results_url.format(task_id=task_id)
+        waited = 0.0
+        interval = self.poll_interval
+        while waited < self.max_poll_wait:
+            try:
+                async with session.get(results_url) as response:
+                    # 404/204 mean the task has not produced a result yet
+                    if response.status == 200:
+                        data = _json_loads(await response.read())
+                        if data:
+                            return self._normalize_task_result(url, data)
+                    elif response.status not in (404, 204):
+                        logger.debug(f"Task {task_id} poll returned status {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.debug(f"Task {task_id} poll failed: {e}")
+            await asyncio.sleep(interval)
+            waited += interval
+            interval = min(interval * 1.5, 10)
+        
+        logger.warning(f"Timed out waiting for task {task_id} ({url}) after {self.max_poll_wait}s")
+        return {"url": url, "html": None, "status": "failed", "error": "Task polling timeout"}
+    
+    async def _stream_tasks(
+        self,
+        session: aiohttp.ClientSession,
+        urls: List[str]
+    ) -> AsyncIterator[Tuple[int, Dict[str, any]]]:
+        """
+        Submit all URLs in one batch task request and yield each result as its
+        task completes, as (position in urls, result) tuples.
+        """
+        logger.info(f"Submitting {len(urls)} URLs as a single batch task")
+        try:
             async with session.post(
-                self.api_url,
-                json=payload,
+                self.task_submit_url,
+                data=_json_dumps({"urls": urls}),
                 headers={'Content-Type': 'application/json'}
             ) as response:
+                await self._adjust_concurrency(response.status)
                 if response.status != 200:
                     error_text = await response.text()
-                    logger.error(f"JS rendering API returned status {response.status}: {error_text}")
-                    # Return failed results for all URLs in batch
-                    return [
-                        {
-                            "url": url,
-                            "html": None,
-                            "status": "failed",
-                            "error": f"API returned status {response.status}: {error_text[:200]}"
-                        }
-                        for url in urls
-                    ]
-                
-                data = await response.json()
-                
-                # Process results
-                results = []
-                if "results" in data:
-                    for result in data["results"]:
-                        results.append({
-                            "url": result.get("url", ""),
-                            "html": result.get("html") if result.get("status") == "success" else None,
-                            "status": result.get("status", "failed"),
-                            "error": result.get("error") if result.get("status") != "success" else None
-                        })
-                else:
-                    # Unexpected response format
-                    logger.warning(f"Unexpected response format from JS rendering API")
-                    return [
-                        {
-                            "url": url,
-                            "html": None,
-                            "status": "failed",
-                            "error": "Unexpected response format from API"
-                        }
-                        for url in urls
-                    ]
-                
-                successful = sum(1 for r in results if r["status"] == "success")
-                failed = len(results) - successful
-                logger.info(f"Batch {batch_num} completed: {successful} successful, {failed} failed")
-                
-                return results
-                
-        except asyncio.TimeoutError:
-            logger.error(f"JS rendering batch {batch_num} timed out")
-            return [
-                {
-                    "url": url,
-                    "html": None,
-                    "status": "failed",
-                    "error": "Request timeout"
-                }
-                for url in urls
-            ]
-        except Exception as e:
-            logger.error(f"JS rendering batch {batch_num} failed: {e}")
-            return [
-                {
-                    "url": url,
-                    "html": None,
-                    "status": "failed",
-                    "error": str(e)
-                }
-                for url in urls
-            ]
+                    logger.error(f"Batch task submission returned status {response.status}: {error_text}")
+                    for position, result in enumerate(self._failed_results(
+                        urls, f"API returned status {response.status}: {error_text[:200]}"
+                    )):
+                        yield position, result
+                    return
+                task_map = self._parse_task_ids(_json_loads(await response.read()), urls)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Batch task submission failed: {e}")
+            for position, result in enumerate(
+                self._failed_results(urls, str(e) or "Batch task submission failed")
+            ):
+                yield position, result
+            return
+        
+        async def poll(task_id: str, position: int) -> Tuple[int, Dict[str, any]]:
+            return position, await self._poll_task(session, task_id, urls[position])
+        
+        for next_done in asyncio.as_completed([
+            poll(task_id, position) for task_id, position in task_map.items()
+        ]):
+            yield await next_done
+        
+        polled = set(task_map.values())
+        for position, url in enumerate(urls):
+            if position not in polled:
+                yield position, self._failed_results([url], "No task id returned by API")[0]
     
-    async def process_urls(
+    async def _process_batch(
         self,
-        urls: List[str]
+        session: aiohttp.ClientSession,
+        urls: List[str],
+        batch_num: int
     ) -> List[Dict[str, any]]:
         """
-        Process URLs in batches with cooldown periods.
+        Process a single batch of URLs.
         
         Args:
-            urls: List of URLs that need JS rendering
+            session: aiohttp session
+            urls: List of URLs to process (up to batch_size)
+            batch_num: Batch number for logging
             
         Returns:
-            List of result dictionaries with html, status, and error fields
+            List of result dictionaries, in input order
+        """
+        results = [None] * len(urls)
+        async for position, result in self._stream_batch(session, urls, batch_num):
+            results[position] = result
+        return results
+    
+    async def _stream_indexed(
+        self,
+        urls: List[str]
+    ) -> AsyncIterator[Tuple[int, Dict[str, any]]]:
+        """
+        Process URLs in batches within the rate limit, yielding each result
+        as soon as the upstream reports it.
+        
+        Batches are dispatched as soon as the token bucket allows, so a batch
+        can start while an earlier one is still rendering (up to
+        max_concurrent_batches at once). A batch holds its admission slot
+        until its response stream is closed.
+        
+        When task_submit_url is configured, all URLs go out in one batch
+        task submission instead and each task's result is yielded as its
+        poll completes.
+        
+        Args:
+            urls: List of URLs that need JS rendering
+            
+        Yields:
+            (position in urls, result dictionary) tuples, in completion order
         """
         if not urls:
-            return []
+            return
         
         # Split URLs into batches
         batches = []
@@ -155,24 +531,106 @@ class AsyncCustomJSRenderer:
         
         logger.info(f"Processing {len(urls)} URLs in {len(batches)} batches of up to {self.batch_size} URLs")
         
-        all_results = []
+        results_queue: asyncio.Queue = asyncio.Queue()
+        batch_done = object()
         
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-            for batch_num, batch_urls in enumerate(batches, 1):
-                # Process batch
-                batch_results = await self._process_batch(session, batch_urls, batch_num)
-                all_results.extend(batch_results)
-                
-                # Cooldown after each batch (except the last one)
-                if batch_num < len(batches):
-                    logger.info(f"Waiting {self.cooldown_seconds} seconds before next batch (cooldown)...")
-                    await asyncio.sleep(self.cooldown_seconds)
+        async def run_batch(session, batch_urls, batch_num):
+            start = (batch_num - 1) * self.batch_size
+            try:
+                async with self._admission:
+                    # Wait for enough rate budget for this batch's URLs
+                    await self._limiter.acquire(len(batch_urls))
+                    async for position, result in self._stream_batch(session, batch_urls, batch_num):
+                        await results_queue.put((start + position, result))
+            finally:
+                await results_queue.put(batch_done)
+        
+        async def run_tasks(session):
+            try:
+                async with self._admission:
+                    # One submission for every URL; rendering is paced upstream
+                    async for item in self._stream_tasks(session, urls):
+                        await results_queue.put(item)
+            finally:
+                await results_queue.put(batch_done)
         
-        # Separate successful and failed URLs
-        successful = [r for r in all_results if r["status"] == "success"]
-        failed = [r for r in all_results if r["status"] == "failed"]
+        successful = failed = 0
+        session = self._get_session()
+        if self.task_submit_url:
+            tasks = [asyncio.create_task(run_tasks(session))]
+        else:
+            tasks = [
+                asyncio.create_task(run_batch(session, batch_urls, batch_num))
+                for batch_num, batch_urls in enumerate(batches, 1)
+            ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await results_queue.get()
+                if item is batch_done:
+                    remaining -= 1
+                    continue
+                if item[1]["status"] == "success":
+                    successful += 1
+                else:
+                    failed += 1
+                yield item
+        finally:
+            # Consumer stopped early or was cancelled: stop outstanding batches
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        logger.info(f"Custom JS rendering completed: {successful} successful, {failed} failed")
+    
+    async def stream_urls(
+        self,
+        urls: List[str]
+    ) -> AsyncIterator[Dict[str, any]]:
+        """
+        Process URLs in batches within the rate limit, yielding each result
+        as soon as the upstream reports it.
         
-        logger.info(f"Custom JS rendering completed: {len(successful)} successful, {len(failed)} failed")
+        Results come in completion order, not input order; each carries the
+        input URL it belongs to in "url" (even if the upstream reported a
+        redirected one), and every input position gets exactly one result.
+        Use process_urls for results in input order.
         
-        return all_results
-
+        Args:
+            urls: List of URLs that need JS rendering
+            
+        Yields:
+            Result dictionaries with html, status, and error fields, in
+            completion order
+        """
+        indexed = self._stream_indexed(urls)
+        try:
+            async for _, result in indexed:
+                yield result
+        finally:
+            # Stops outstanding batches if the consumer quits early
+            await indexed.aclose()
+    
+    async def process_urls(
+        self,
+        urls: List[str]
+    ) -> List[Dict[str, any]]:
+        """
+        Process URLs in batches within the rate limit.
+        
+        Collects every result in input order (one per URL); use stream_urls
+        to handle results as they arrive instead. The connection pool is reused across calls,
+        so call close() (or use the renderer as an async context manager)
+        when done.
+        
+        Args:
+            urls: List of URLs that need JS rendering
+            
+        Returns:
+            List of result dictionaries with html, status, and error fields,
+            in input order
+        """
+        results = [None] * len(urls)
+        async for position, result in self._stream_indexed(urls):
+            results[position] = result
+        return results
@@ -543,27 +543,30 @@ class AsyncDecodoFallback:
             
             logger.info(f"Received {len(task_map)} task IDs, starting polling")
             
-            # Step 3: Poll results concurrently
-            semaphore = asyncio.Semaphore(self.max_concurrent)
+            # Step 3: Poll results concurrently. At most max_concurrent polls are
+            # alive at once; the next task is only spawned when one finishes,
+            # so memory scales with max_concurrent rather than the task count
+            task_id_to_result = {}
+            pending_tasks = iter(task_map.items())
+            in_flight: Dict[asyncio.Task, str] = {}
             
-            async def poll_with_semaphore(task_id: str, url: Optional[str]):
-                async with semaphore:
-                    return await self._poll_task_result(session, task_id, url)
+            def spawn_next():
+                item = next(pending_tasks, None)
+                if item is not None:
+                    task_id, url = item
+                    poll = asyncio.ensure_future(self._poll_task_result(session, task_id, url))
+                    in_flight[poll] = task_id
             
-            # Create polling tasks
-            polling_tasks = [
-                poll_with_semaphore(task_id, url)
-                for task_id, url in task_map.items()
-            ]
-            
-            # Execute all polling tasks concurrently
-            poll_results = await asyncio.gather(*polling_tasks, return_exceptions=True)
+            for _ in range(self.max_concurrent):
+                spawn_next()
             
-            # Map poll results back to URLs
-            task_id_to_result = {
-                task_id: result
-                for task_id, result in zip(task_map.keys(), poll_results)
-            }
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for poll in done:
+                    task_id = in_flight.pop(poll)
+                    # Failed polls are kept as exceptions and reported below
+                    task_id_to_result[task_id] = poll.exception() or poll.result()
+                    spawn_next()
             
             # Build final results list, ensuring all URLs have results
             processed_results = []
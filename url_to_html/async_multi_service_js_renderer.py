@@ -4,9 +4,13 @@ Async multi-service JS renderer that distributes URLs across multiple services i
 
 import logging
 import asyncio
+import time
 import aiohttp
-from typing import List, Dict, Optional
+from collections import deque
+from typing import List, Dict, Sequence, Tuple
 from .service_pool_manager import ServicePoolManager, ServiceInfo
+from .dns_resolver import build_resolver, DNS_CACHE_TTL
+from .async_custom_js_renderer import _json_dumps, _json_loads
 from .exceptions import JSRenderError
 
 logger = logging.getLogger(__name__)
@@ -20,7 +24,9 @@ class AsyncMultiServiceJSRenderer:
         service_endpoints: List[str],
         batch_size: int = 20,
         cooldown_seconds: int = 120,
-        timeout: int = 300
+        timeout: int = 300,
+        max_in_flight: int = 1,
+        replica_nameservers: Sequence[str] = ()
     ):
         """
         Initialize the multi-service JS renderer.
@@ -28,16 +34,36 @@ class AsyncMultiServiceJSRenderer:
         Args:
             service_endpoints: List of service endpoint URLs
             batch_size: Number of URLs per batch (default: 20)
-            cooldown_seconds: Cooldown period after each batch (default: 120)
+            cooldown_seconds: Min seconds between batch starts on one service (default: 120)
             timeout: Request timeout in seconds
+            max_in_flight: Concurrent batches one service may take (default: 1)
+            replica_nameservers: Extra nameservers raced against the system resolver (default: none)
         """
         self.service_pool = ServicePoolManager(
             service_endpoints=service_endpoints,
             batch_size=batch_size,
-            cooldown_seconds=cooldown_seconds
+            cooldown_seconds=cooldown_seconds,
+            max_in_flight=max_in_flight
         )
         self.batch_size = batch_size
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.replica_nameservers = tuple(replica_nameservers)
+    
+    async def _record_outcome(
+        self,
+        service: ServiceInfo,
+        urls: List[str],
+        started: float,
+        succeeded: bool
+    ):
+        """Let the pool resize the service's next batch based on this one."""
+        await self.service_pool.record_batch_outcome(
+            service,
+            len(urls),
+            time.monotonic() - started,
+            succeeded,
+            self.timeout.total
+        )
     
     async def _process_batch_with_service(
         self,
@@ -60,17 +86,21 @@ class AsyncMultiServiceJSRenderer:
         """
         logger.info(f"Processing batch {batch_id} with service {service.endpoint} ({len(urls)} URLs)")
         
+        started = time.monotonic()
         try:
             payload = {"urls": urls}
             
             async with session.post(
                 service.endpoint,
-                json=payload,
+                data=_json_dumps(payload),
                 headers={'Content-Type': 'application/json'}
             ) as response:
                 if response.status != 200:
-                    error_text = await response.text()
+                    # Only the first 200 bytes are reported; don't buffer the whole error page
+                    error_text = (await response.content.read(200)).decode('utf-8', errors='ignore')
+                    response.release()
                     logger.error(f"Service {service.endpoint} returned status {response.status}: {error_text[:200]}")
+                    await self._record_outcome(service, urls, started, succeeded=False)
                     await self.service_pool.mark_service_failed(service)
                     # Return failed results
                     return [
@@ -83,7 +113,8 @@ class AsyncMultiServiceJSRenderer:
                         for url in urls
                     ]
                 
-                data = await response.json()
+                # orjson when installed; response bodies carry full HTML per URL
+                data = _json_loads(await response.read())
                 
                 # Process results
                 results = []
@@ -97,6 +128,7 @@ class AsyncMultiServiceJSRenderer:
                         })
                 else:
                     logger.warning(f"Unexpected response format from service {service.endpoint}")
+                    await self._record_outcome(service, urls, started, succeeded=False)
                     return [
                         {
                             "url": url,
@@ -111,13 +143,16 @@ class AsyncMultiServiceJSRenderer:
                 failed = len(results) - successful
                 logger.info(f"Batch {batch_id} completed on {service.endpoint}: {successful} successful, {failed} failed")
                 
-                # Mark service as in cooldown
+                # Feed latency-aware service selection, then start the cooldown
+                await self.service_pool.record_latency(service, time.monotonic() - started)
+                await self._record_outcome(service, urls, started, succeeded=True)
                 await self.service_pool.mark_service_cooldown(service)
                 
                 return results
                 
         except asyncio.TimeoutError:
             logger.error(f"Batch {batch_id} timed out on service {service.endpoint}")
+            await self._record_outcome(service, urls, started, succeeded=False)
             await self.service_pool.mark_service_failed(service)
             return [
                 {
@@ -130,6 +165,7 @@ class AsyncMultiServiceJSRenderer:
             ]
         except Exception as e:
             logger.error(f"Batch {batch_id} failed on service {service.endpoint}: {e}")
+            await self._record_outcome(service, urls, started, succeeded=False)
             await self.service_pool.mark_service_failed(service)
             return [
                 {
@@ -157,42 +193,57 @@ class AsyncMultiServiceJSRenderer:
         if not urls:
             return []
         
-        # Split URLs into batches
-        batches = []
-        for i in range(0, len(urls), self.batch_size):
-            batch = urls[i:i + self.batch_size]
-            batches.append(batch)
+        # Render each distinct URL once; results are fanned back out below
+        input_urls = urls
+        urls = list(dict.fromkeys(urls))
+        if len(urls) < len(input_urls):
+            logger.info(f"Deduplicated {len(input_urls)} URLs to {len(urls)} unique")
+        
+        # URL-level queue: each worker drains as many URLs as its service's
+        # current batch size allows, so fast services take bigger slices.
+        # Workers only share one event loop, so a plain deque needs no locking
+        url_queue = deque(enumerate(urls))
         
-        logger.info(f"Processing {len(urls)} URLs in {len(batches)} batches across {self.service_pool.get_service_count()} services")
+        logger.info(f"Processing {len(urls)} URLs in batches of up to {self.batch_size} across {self.service_pool.get_service_count()} services")
         
-        all_results = []
-        batch_queue = asyncio.Queue()
+        # (first URL index, batch URLs, results) per batch; batches take
+        # consecutive indexes, so results are placed back by position
+        batch_results: List[Tuple[int, List[str], List[Dict[str, any]]]] = []
+        # One worker per service batch slot for maximum parallelism
+        num_workers = min(
+            len(urls),
+            self.service_pool.get_service_count() * self.service_pool.max_in_flight
+        )
+        batch_counter = 0
         
-        # Add all batches to queue
-        for batch_num, batch_urls in enumerate(batches, 1):
-            await batch_queue.put((batch_num, batch_urls))
+        def drain(limit: int) -> List[Tuple[int, str]]:
+            """Take up to limit queued URLs without waiting."""
+            items = []
+            while len(items) < limit and url_queue:
+                items.append(url_queue.popleft())
+            return items
         
-        async def process_batch_worker():
-            """Worker coroutine that processes batches from queue."""
-            while True:
-                batch_num = None
-                batch_urls = None
+        async def process_batch_worker(session: aiohttp.ClientSession):
+            """Worker coroutine that renders slices of the URL queue until it is empty."""
+            nonlocal batch_counter
+            while url_queue:
+                batch_urls: List[str] = []
+                first_idx = -1
                 try:
-                    # Get batch from queue
-                    try:
-                        batch_num, batch_urls = await asyncio.wait_for(batch_queue.get(), timeout=1.0)
-                    except asyncio.TimeoutError:
-                        # Check if queue is empty
-                        if batch_queue.empty():
-                            break
-                        continue
-                    
                     # Wait for an available service
                     service = await self.service_pool.wait_for_available_service(timeout=300)
+                    # Size the slice for the service that will render it
+                    items = drain(service.batch_size if service else self.batch_size)
+                    if not items:
+                        return
+                    first_idx = items[0][0]
+                    batch_urls = [url for _, url in items]
+                    batch_counter += 1
+                    batch_num = batch_counter
                     if not service:
                         logger.error(f"Timeout waiting for available service for batch {batch_num}")
                         # Add failed results
-                        all_results.extend([
+                        batch_results.append((first_idx, batch_urls, [
                             {
                                 "url": url,
                                 "html": None,
@@ -200,8 +251,7 @@ class AsyncMultiServiceJSRenderer:
                                 "error": "No available service (timeout)"
                             }
                             for url in batch_urls
-                        ])
-                        batch_queue.task_done()
+                        ]))
                         continue
                     
                     # Mark service as processing
@@ -209,49 +259,72 @@ class AsyncMultiServiceJSRenderer:
                     
                     # Process batch
                     try:
-                        async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                            batch_results = await self._process_batch_with_service(
-                                session, service, batch_urls, batch_num
-                            )
-                            all_results.extend(batch_results)
+                        batch_results.append((first_idx, batch_urls, await self._process_batch_with_service(
+                            session, service, batch_urls, batch_num
+                        )))
                     finally:
-                        batch_queue.task_done()
+                        await self.service_pool.mark_service_done(service)
                     
                 except Exception as e:
                     logger.error(f"Error in batch worker: {e}")
-                    if batch_num is not None and batch_urls is not None:
-                        # Add failed results
-                        all_results.extend([
-                            {
-                                "url": url,
-                                "html": None,
-                                "status": "failed",
-                                "error": str(e)
-                            }
-                            for url in batch_urls
-                        ])
-                        batch_queue.task_done()
-        
-        # Start worker tasks (one per service for maximum parallelism)
-        num_workers = min(len(batches), self.service_pool.get_service_count())
-        workers = [asyncio.create_task(process_batch_worker()) for _ in range(num_workers)]
-        
-        # Wait for all batches to complete
-        await batch_queue.join()
+                    # Add failed results
+                    batch_results.append((first_idx, batch_urls, [
+                        {
+                            "url": url,
+                            "html": None,
+                            "status": "failed",
+                            "error": str(e)
+                        }
+                        for url in batch_urls
+                    ]))
         
-        # Cancel workers
-        for worker in workers:
-            worker.cancel()
+        # One pooled session for every batch, so connections to each service
+        # are reused instead of re-handshaking per batch
+        resolver = build_resolver(self.replica_nameservers)
+        connector = aiohttp.TCPConnector(
+            limit=self.service_pool.get_service_count() * 2,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            resolver=resolver,
+            keepalive_timeout=60
+        )
+        try:
+            async with aiohttp.ClientSession(timeout=self.timeout, connector=connector) as session:
+                # Workers exit once the URL queue is drained
+                await asyncio.gather(*(
+                    process_batch_worker(session) for _ in range(num_workers)
+                ))
+        finally:
+            await resolver.close()
         
-        # Wait for workers to finish
-        await asyncio.gather(*workers, return_exceptions=True)
+        # Services answer in request order, so a batch's nth result belongs to
+        # its nth URL whatever name the service reported it under
+        unique_results: List[Dict[str, any]] = [None] * len(urls)
+        for first_idx, batch_urls, results in batch_results:
+            for offset, url in enumerate(batch_urls):
+                if offset < len(results):
+                    unique_results[first_idx + offset] = results[offset]
+                else:
+                    unique_results[first_idx + offset] = {
+                        "url": url,
+                        "html": None,
+                        "status": "failed",
+                        "error": "No result returned by service"
+                    }
+        # Fan out by index: every input position gets the result of its URL's
+        # position in the deduplicated list
+        position_of = {url: idx for idx, url in enumerate(urls)}
+        all_results = [unique_results[position_of[url]] for url in input_urls]
         
-        # Separate successful and failed URLs
-        successful = [r for r in all_results if r["status"] == "success"]
-        failed = [r for r in all_results if r["status"] == "failed"]
+        # Count successful and failed URLs in one pass
+        successful = failed = 0
+        for r in all_results:
+            if r["status"] == "success":
+                successful += 1
+            elif r["status"] == "failed":
+                failed += 1
         
         status_summary = await self.service_pool.get_status_summary()
-        logger.info(f"Multi-service JS rendering completed: {len(successful)} successful, {len(failed)} failed")
+        logger.info(f"Multi-service JS rendering completed: {successful} successful, {failed} failed")
         logger.info(f"Service status: {status_summary}")
         
         return all_results
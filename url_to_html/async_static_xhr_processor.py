@@ -4,14 +4,28 @@ Async processor for static and XHR fetches with high concurrency.
 
 import logging
 import asyncio
+import random
+import socket
 import aiohttp
-from typing import List, Dict, Optional, Tuple
-from urllib.parse import urljoin, urlparse
+from multidict import CIMultiDict
+from typing import List, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlparse
 from .content_analyzer import ContentAnalyzer
-from .exceptions import TimeoutError, InvalidURLError
+from .dns_resolver import PinnedResolver, build_resolver, DNS_CACHE_TTL
+from .exceptions import TimeoutError, InvalidURLError, ResponseTooLargeError
+from .xhr_fetcher import _api_endpoints
 
 logger = logging.getLogger(__name__)
 
+# Static fetch statuses that are retried before falling back
+_TRANSIENT_STATUSES = frozenset((429, 502, 503, 504))
+
+# Response bodies are read in chunks of this size up to max_response_bytes
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Content-Type substrings worth reading an XHR response body for
+_XHR_CONTENT_TYPES = ('json', 'html')
+
 
 class AsyncStaticXHRProcessor:
     """High-concurrency async processor for static and XHR fetches."""
@@ -20,7 +34,13 @@ class AsyncStaticXHRProcessor:
         self,
         timeout: int = 30,
         headers: Optional[Dict[str, str]] = None,
-        max_concurrent: int = 50
+        max_concurrent: int = 50,
+        resolver: Optional[PinnedResolver] = None,
+        static_retries: int = 2,
+        max_response_bytes: int = 2_000_000,
+        limit_per_host: int = 8,
+        max_xhr_candidates: int = 5,
+        replica_nameservers: Sequence[str] = ()
     ):
         """
         Initialize the async processor.
@@ -29,9 +49,20 @@ class AsyncStaticXHRProcessor:
             timeout: Request timeout in seconds
             headers: Custom headers to include in requests
             max_concurrent: Maximum concurrent requests
+            resolver: Pre-warmed resolver to reuse (default: one per batch)
+            static_retries: Retries for transient static fetch failures (default: 2)
+            max_response_bytes: Larger response bodies fail the fetch instead of being read (default: 2 MB)
+            limit_per_host: Max concurrent connections to one origin (default: 8, 0 = unlimited)
+            max_xhr_candidates: Most generated API endpoints to probe per URL (default: 5)
+            replica_nameservers: Extra nameservers raced against the system resolver
+                when no resolver is passed (default: none)
         """
         self.timeout = aiohttp.ClientTimeout(total=timeout)
         self.max_concurrent = max_concurrent
+        self.static_retries = static_retries
+        self.max_response_bytes = max_response_bytes
+        self.limit_per_host = limit_per_host
+        self.max_xhr_candidates = max_xhr_candidates
         self.default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -42,121 +73,218 @@ class AsyncStaticXHRProcessor:
         }
         if headers:
             self.default_headers.update(headers)
+        # Built once; _fetch_xhr only adds the per-URL Referer to a copy
+        self._xhr_headers_template = CIMultiDict(self.default_headers)
+        self._xhr_headers_template.update({
+            'Accept': 'application/json, text/html, */*',
+            'X-Requested-With': 'XMLHttpRequest',
+        })
         
         self.content_analyzer = ContentAnalyzer()
+        self.resolver = resolver
+        self.replica_nameservers = tuple(replica_nameservers)
+        # Set while used as an async context manager
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._resolver: Optional[PinnedResolver] = None
+    
+    def _create_session(self, resolver: PinnedResolver) -> aiohttp.ClientSession:
+        """Build a pooled session whose connector resolves through resolver."""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            # Keeps a batch dominated by one domain from tripping its rate limits
+            limit_per_host=self.limit_per_host,
+            resolver=resolver,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            # Both address families, so IPv6-only hosts stay reachable; must
+            # match PinnedResolver.warm's family for pinned answers to be used
+            family=socket.AF_UNSPEC
+        )
+        return aiohttp.ClientSession(
+            timeout=self.timeout,
+            connector=connector,
+            headers=self.default_headers
+        )
+    
+    async def __aenter__(self):
+        """
+        Open a session kept across process_batch calls.
+        
+        Without the context manager each process_batch call opens and closes
+        its own session.
+        """
+        self._resolver = self.resolver or PinnedResolver(build_resolver(self.replica_nameservers))
+        self._session = self._create_session(self._resolver)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close the shared session."""
+        await self.close()
+    
+    async def close(self):
+        """Close the shared session and the resolver it created (cleanup)."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._resolver is not None and self.resolver is None:
+            await self._resolver.close()
+        self._resolver = None
+    
+    async def _read_capped(self, response: aiohttp.ClientResponse) -> str:
+        """
+        Read and decode a response body, giving up once it exceeds max_response_bytes.
+        
+        Bounds memory per in-flight response. A cut-off page would pass as a
+        complete fetch, so oversized bodies fail instead and the URL falls back.
+        
+        Raises:
+            ResponseTooLargeError: If the body is larger than max_response_bytes
+        """
+        url = str(response.url)
+        if response.content_length is not None and response.content_length > self.max_response_bytes:
+            response.close()
+            raise ResponseTooLargeError(
+                f"Response declares {response.content_length} bytes",
+                url=url, max_bytes=self.max_response_bytes
+            )
+        
+        buf = bytearray()
+        async for chunk in response.content.iter_chunked(_READ_CHUNK_SIZE):
+            buf.extend(chunk)
+            if len(buf) > self.max_response_bytes:
+                response.close()
+                raise ResponseTooLargeError(
+                    f"Response exceeded {self.max_response_bytes} bytes",
+                    url=url, max_bytes=self.max_response_bytes
+                )
+        try:
+            return buf.decode(response.charset or 'utf-8', errors='ignore')
+        except LookupError:
+            # Unknown charset label
+            return buf.decode('utf-8', errors='ignore')
+    
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Retry-After if numeric, else capped exponential backoff with jitter."""
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        return min(2 ** attempt, 8) + random.random() * 0.5
     
     async def _fetch_static(
         self,
         session: aiohttp.ClientSession,
         url: str
     ) -> Tuple[Optional[str], int]:
-        """Fetch URL using static HTTP GET."""
-        try:
-            async with session.get(url, headers=self.default_headers) as response:
-                status_code = response.status
-                
-                # Try to decode content
-                try:
-                    content = await response.text()
-                except Exception:
-                    content = await response.read()
-                    try:
-                        content = content.decode('utf-8')
-                    except:
-                        content = content.decode('utf-8', errors='ignore')
-                
-                logger.debug(f"Static fetch for {url}: {status_code}, {len(content)} bytes")
-                return content, status_code
-                
-        except asyncio.TimeoutError:
-            logger.warning(f"Static fetch timeout for: {url}")
-            return None, 0
-        except aiohttp.InvalidURL:
-            logger.error(f"Invalid URL: {url}")
-            return None, 0
-        except Exception as e:
-            logger.warning(f"Static fetch failed for {url}: {e}")
-            return None, 0
+        """
+        Fetch URL using static HTTP GET.
+        
+        Transient failures (429/502/503/504 or a failed connect) are retried
+        up to static_retries times before the result is handed to the
+        fallback chain.
+        """
+        for attempt in range(self.static_retries + 1):
+            retries_left = attempt < self.static_retries
+            try:
+                # default_headers are already the session's headers
+                async with session.get(url) as response:
+                    status_code = response.status
+                    
+                    if status_code in _TRANSIENT_STATUSES and retries_left:
+                        delay = self._retry_delay(attempt, response.headers.get('Retry-After'))
+                        response.release()
+                        logger.debug(f"Static fetch for {url} returned {status_code}, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                        continue
+                    
+                    content = await self._read_capped(response)
+                    
+                    logger.debug(f"Static fetch for {url}: {status_code}, {len(content)} bytes")
+                    return content, status_code
+                    
+            except aiohttp.ClientConnectorError as e:
+                if retries_left:
+                    delay = self._retry_delay(attempt)
+                    logger.debug(f"Static fetch connect failed for {url}: {e}, retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.warning(f"Static fetch failed for {url}: {e}")
+                return None, 0
+            except asyncio.TimeoutError:
+                logger.warning(f"Static fetch timeout for: {url}")
+                return None, 0
+            except aiohttp.InvalidURL:
+                logger.error(f"Invalid URL: {url}")
+                return None, 0
+            except ResponseTooLargeError as e:
+                logger.warning(f"Static fetch for {url} too large, falling back: {e}")
+                return None, 0
+            except Exception as e:
+                logger.warning(f"Static fetch failed for {url}: {e}")
+                return None, 0
+        
+        return None, 0
     
     def _generate_api_endpoints(self, url: str) -> List[str]:
         """Generate potential API endpoints based on the URL."""
         parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-        path = parsed.path.rstrip('/')
-        
-        endpoints = []
-        api_patterns = [
-            '/api' + path,
-            '/api/v1' + path,
-            '/api/v2' + path,
-            '/api/data' + path,
-            path + '/data',
-            path + '/api',
-            '/data' + path,
-        ]
-        
-        for pattern in api_patterns:
-            endpoints.append(urljoin(base_url, pattern))
-        
-        if path:
-            endpoints.append(urljoin(base_url, path + '.json'))
-        
-        if parsed.query:
-            for pattern in api_patterns[:3]:
-                endpoints.append(urljoin(base_url, pattern + '?' + parsed.query))
-        
-        return endpoints
+        endpoints = _api_endpoints(parsed.scheme, parsed.netloc, parsed.path, parsed.query)
+        return list(endpoints[:self.max_xhr_candidates])
+    
+    async def _try_xhr_endpoint(
+        self,
+        session: aiohttp.ClientSession,
+        endpoint: str,
+        xhr_headers: CIMultiDict
+    ) -> Optional[Tuple[str, int]]:
+        """Fetch one XHR candidate; returns (content, status) or None if unusable."""
+        try:
+            async with session.get(endpoint, headers=xhr_headers) as response:
+                # Skip error pages and irrelevant payloads without reading the body
+                if response.status != 200:
+                    response.release()
+                    return None
+                content_type = response.headers.get('Content-Type', '').lower()
+                if content_type and not any(t in content_type for t in _XHR_CONTENT_TYPES):
+                    response.release()
+                    return None
+                content = await self._read_capped(response)
+                logger.debug(f"XHR fetch successful: {endpoint}")
+                return content, response.status
+        except Exception as e:
+            logger.debug(f"XHR fetch failed for {endpoint}: {e}")
+            return None
     
     async def _fetch_xhr(
         self,
         session: aiohttp.ClientSession,
         url: str
     ) -> Tuple[Optional[str], int]:
-        """Fetch URL using XHR/API endpoints."""
-        xhr_headers = self.default_headers.copy()
-        xhr_headers.update({
-            'Accept': 'application/json, text/html, */*',
-            'X-Requested-With': 'XMLHttpRequest',
-            'Referer': url,
-        })
+        """
+        Fetch URL using XHR/API endpoints.
         
-        # Try original URL with XHR headers
-        try:
-            async with session.get(url, headers=xhr_headers) as response:
-                if response.status == 200:
-                    try:
-                        content = await response.text()
-                        logger.debug(f"XHR fetch successful (original): {url}")
-                        return content, response.status
-                    except Exception:
-                        content = await response.read()
-                        try:
-                            content = content.decode('utf-8')
-                        except:
-                            content = content.decode('utf-8', errors='ignore')
-                        return content, response.status
-        except Exception as e:
-            logger.debug(f"XHR fetch failed for original URL {url}: {e}")
+        The original URL and every generated endpoint are probed concurrently;
+        the first usable response wins and the remaining probes are cancelled.
+        """
+        xhr_headers = self._xhr_headers_template.copy()
+        xhr_headers['Referer'] = url
         
-        # Try alternative endpoints
-        api_endpoints = self._generate_api_endpoints(url)
-        for endpoint in api_endpoints:
-            try:
-                async with session.get(endpoint, headers=xhr_headers) as response:
-                    if response.status == 200:
-                        try:
-                            content = await response.text()
-                            logger.debug(f"XHR fetch successful (endpoint): {endpoint}")
-                            return content, response.status
-                        except Exception:
-                            content = await response.read()
-                            try:
-                                content = content.decode('utf-8')
-                            except:
-                                content = content.decode('utf-8', errors='ignore')
-                            return content, response.status
-            except Exception:
-                continue
+        candidates = [url] + self._generate_api_endpoints(url)
+        pending = {
+            asyncio.ensure_future(self._try_xhr_endpoint(session, endpoint, xhr_headers))
+            for endpoint in candidates
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
         
         logger.debug(f"XHR fetch failed for all endpoints: {url}")
         return None, 0
@@ -197,11 +325,24 @@ class AsyncStaticXHRProcessor:
                 }
             else:
                 logger.debug(f"Static fetch returned insufficient content for {url}: {reason}")
+                
+                # A bare app shell won't be recovered by XHR probes; skip them
+                needs_js, js_reason = self.content_analyzer.needs_js_rendering(html_content)
+                if needs_js:
+                    logger.debug(f"Skipping XHR for {url}: {js_reason}")
+                    return {
+                        "url": url,
+                        "html": None,
+                        "method": None,
+                        "needs_js": True,
+                        "error": f"Static fetch returned a JS app shell: {js_reason}"
+                    }
         
         # Try XHR fetch
         html_content, status_code = await self._fetch_xhr(session, url)
         
         if html_content is not None:
+            # A page identical to the static one hits the analyzer's verdict cache
             should_fallback, reason = self.content_analyzer.should_fallback(
                 html_content, status_code
             )
@@ -235,41 +376,64 @@ class AsyncStaticXHRProcessor:
         """
         Process a batch of URLs with high concurrency.
         
+        A fixed pool of max_concurrent workers drains a queue of URLs, so the
+        number of live tasks stays constant regardless of batch size.
+        
         Args:
             urls: List of URLs to process
             
         Returns:
-            List of result dictionaries
+            List of result dictionaries, in input order (duplicate URLs are
+            fetched once and share a result)
         """
-        semaphore = asyncio.Semaphore(self.max_concurrent)
+        # Collapse duplicates; idx_map points each input position at its unique URL
+        unique: Dict[str, int] = {}
+        idx_map = [unique.setdefault(url, len(unique)) for url in urls]
+        if len(unique) < len(urls):
+            logger.info(f"Deduplicated {len(urls)} URLs to {len(unique)} unique")
+        urls = list(unique)
         
-        async def process_with_semaphore(session: aiohttp.ClientSession, url: str):
-            async with semaphore:
-                return await self._process_single_url(session, url)
+        results: List[Optional[Dict[str, any]]] = [None] * len(urls)
+        num_workers = min(len(urls), self.max_concurrent)
+        url_queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(urls):
+            url_queue.put_nowait(item)
+        for _ in range(num_workers):
+            url_queue.put_nowait(None)
         
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
-        async with aiohttp.ClientSession(
-            timeout=self.timeout,
-            connector=connector,
-            headers=self.default_headers
-        ) as session:
-            tasks = [process_with_semaphore(session, url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle exceptions
-            processed_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error processing {urls[i]}: {result}")
-                    processed_results.append({
-                        "url": urls[i],
+        async def worker(session: aiohttp.ClientSession):
+            while True:
+                item = await url_queue.get()
+                if item is None:
+                    return
+                idx, url = item
+                try:
+                    results[idx] = await self._process_single_url(session, url)
+                except Exception as e:
+                    logger.error(f"Error processing {url}: {e}")
+                    results[idx] = {
+                        "url": url,
                         "html": None,
                         "method": None,
                         "needs_js": True,
-                        "error": str(result)
-                    })
-                else:
-                    processed_results.append(result)
-            
-            return processed_results
-
+                        "error": str(e)
+                    }
+        
+        if self._session is not None:
+            # Long-lived session from the async context manager
+            await self._resolver.warm(urls)
+            await asyncio.gather(*(worker(self._session) for _ in range(num_workers)))
+            return [results[i] for i in idx_map]
+        
+        # One-off session for this batch
+        resolver = self.resolver or PinnedResolver(build_resolver(self.replica_nameservers))
+        await resolver.warm(urls)
+        try:
+            async with self._create_session(resolver) as session:
+                await asyncio.gather(*(worker(session) for _ in range(num_workers)))
+        finally:
+            # The connector does not close resolvers it was handed
+            if self.resolver is None:
+                await resolver.close()
+        
+        return [results[i] for i in idx_map]
@@ -34,8 +34,47 @@ def _normalize_domain_list(domains: Optional[List[str]]) -> List[str]:
     return normalized
 
 
+def setup_event_loop() -> bool:
+    """
+    Install uvloop as the asyncio event loop policy when it is available.
+    
+    Call before asyncio.run() in entrypoints that drive the batch processors.
+    
+    Returns:
+        True if uvloop was installed, False if the default loop is kept
+    """
+    try:
+        import uvloop
+    except ImportError:
+        # uvloop not installed (or Windows), use the default asyncio event loop
+        return False
+    uvloop.install()
+    return True
+
+
 class BatchFetcherConfig:
-    """Configuration for batch URL fetching."""
+    """
+    Configuration for batch URL fetching.
+    
+    Batch runs are dominated by event loop overhead at high concurrency;
+    installing uvloop (pip install url-to-html[fast]) and calling
+    setup_event_loop() before asyncio.run() is recommended.
+    """
+    
+    # No per-instance __dict__; the API layer still assigns fields after construction
+    __slots__ = (
+        "static_xhr_concurrency", "static_xhr_timeout", "static_xhr_headers",
+        "static_xhr_per_host", "custom_js_service_endpoints",
+        "custom_js_batch_size", "custom_js_cooldown_seconds", "custom_js_timeout",
+        "custom_js_max_retries", "custom_js_skip_domains", "decodo_enabled",
+        "decodo_max_concurrent", "decodo_timeout", "decodo_headless_mode",
+        "decodo_location", "decodo_language", "decodo_target",
+        "decodo_device_type", "decodo_api_endpoint", "decodo_results_endpoint",
+        "decodo_poll_interval", "decodo_max_poll_attempts", "min_content_length",
+        "min_text_length", "min_meaningful_elements", "text_to_markup_ratio",
+        "save_outputs", "output_dir", "output_compression", "enable_logging",
+        "dns_replica_nameservers",
+    )
     
     def __init__(
         self,
@@ -43,6 +82,7 @@ class BatchFetcherConfig:
         static_xhr_concurrency: int = 50,
         static_xhr_timeout: int = 30,
         static_xhr_headers: Optional[Dict[str, str]] = None,
+        static_xhr_per_host: int = 8,
         
         # Custom JS Service (Multi-Service)
         custom_js_service_endpoints: Optional[List[str]] = None,
@@ -75,7 +115,9 @@ class BatchFetcherConfig:
         # General
         save_outputs: bool = True,
         output_dir: str = "outputs",
-        enable_logging: bool = True
+        output_compression: Optional[str] = None,
+        enable_logging: bool = True,
+        dns_replica_nameservers: Optional[List[str]] = None
     ):
         """
         Initialize batch fetcher configuration.
@@ -84,6 +126,7 @@ class BatchFetcherConfig:
             static_xhr_concurrency: Max concurrent static/XHR requests
             static_xhr_timeout: Timeout for static/XHR requests
             static_xhr_headers: Custom headers for static/XHR
+            static_xhr_per_host: Max concurrent static/XHR connections per host (default: 8)
             
             custom_js_api_url: Custom JS rendering API endpoint
             custom_js_batch_size: URLs per batch (default: 20)
@@ -112,12 +155,17 @@ class BatchFetcherConfig:
             
             save_outputs: Whether to save HTML outputs
             output_dir: Directory for saved outputs
+            output_compression: Compress saved outputs: "gzip", "zstd" (needs zstandard) or None (default: None)
             enable_logging: Whether to enable logging
+            dns_replica_nameservers: Nameserver IPs (e.g. "1.1.1.1") raced against the
+                system resolver; they see every looked-up hostname and bypass
+                split-horizon DNS, so leave empty unless that is acceptable (default: none)
         """
         # Static/XHR
         self.static_xhr_concurrency = static_xhr_concurrency
         self.static_xhr_timeout = static_xhr_timeout
         self.static_xhr_headers = static_xhr_headers or {}
+        self.static_xhr_per_host = static_xhr_per_host
         
         # Custom JS Service (Multi-Service)
         # Default service endpoints if not provided
@@ -167,7 +215,9 @@ class BatchFetcherConfig:
         # General
         self.save_outputs = save_outputs
         self.output_dir = output_dir
+        self.output_compression = output_compression
         self.enable_logging = enable_logging
+        self.dns_replica_nameservers = tuple(dns_replica_nameservers or ())
 
     def set_custom_js_skip_domains(self, domains: Optional[List[str]]):
         """Update the list of domains that should bypass custom JS."""
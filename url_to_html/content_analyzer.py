@@ -3,23 +3,144 @@ Content analysis and detection for blocked or skeleton content.
 """
 
 import logging
+import hashlib
 import json
 import re
-from bs4 import BeautifulSoup
-from typing import Optional, Tuple
+import threading
+from collections import OrderedDict
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+from typing import Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
+# Prefer the C-based lxml parser; html.parser is pure Python and dominates analysis time
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    # lxml not installed, use the standard library parser
+    _HTML_PARSER = 'html.parser'
+
+# Skeleton detection only needs a few counts, which selectolax gets far faster than bs4
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    # selectolax not installed, analyze with BeautifulSoup
+    LexborHTMLParser = None
+
+try:
+    import xxhash
+except ImportError:
+    # xxhash not installed, digest with hashlib's blake2b
+    xxhash = None
+
+# Markers of a client-rendered app shell: an empty framework mount point or a
+# "JavaScript required" notice
+_JS_SHELL_MARKERS = re.compile(
+    r'<div[^>]*\bid=["\'](?:root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>'
+    r'|(?:enable|requires?|need)\s+javascript',
+    re.I
+)
+
+# Same markers for raw response bytes
+_JS_SHELL_MARKERS_BYTES = re.compile(_JS_SHELL_MARKERS.pattern.encode(), re.I)
+
+# Tags that count as meaningful when they directly hold a string
+_TEXT_CONTAINER_TAGS = frozenset(('p', 'article', 'section', 'div'))
+
+# String node types get_text() includes by default (no comments, doctypes, or
+# script/style/ruby strings)
+_TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Pages without a template tag skip the bs4 template pass
+_TEMPLATE_TAG = re.compile(r'<template', re.I)
+_TEMPLATE_TAG_BYTES = re.compile(_TEMPLATE_TAG.pattern.encode(), re.I)
+
+# Parents whose text nodes bs4 excludes from get_text(); used by the lexbor walk
+_NON_TEXT_PARENTS = frozenset(('script', 'style', 'rt', 'rp'))
+
+# Common skeleton/placeholder indicators, matched in one case-insensitive pass
+_SKELETON_INDICATORS = re.compile(r'loading|skeleton|placeholder|spinner|shimmer|pulse', re.I)
+_SKELETON_INDICATORS_BYTES = re.compile(_SKELETON_INDICATORS.pattern.encode(), re.I)
+
+# is_skeleton_content verdicts keyed by (content digest, status, thresholds);
+# least recently used entries are evicted past _VERDICT_CACHE_SIZE. Analyzers
+# run on fetcher threads, so every access holds _VERDICT_CACHE_LOCK
+_VERDICT_CACHE: "OrderedDict[tuple, Tuple[bool, str]]" = OrderedDict()
+_VERDICT_CACHE_SIZE = 2048
+_VERDICT_CACHE_LOCK = threading.Lock()
+
+
+def _prescreen_skeleton(
+    html_content: Union[str, bytes],
+    content_length: int,
+    definitely_valid_length: int
+) -> Tuple[int, Optional[Tuple[bool, str]]]:
+    """
+    Parse-free part of skeleton analysis.
+    
+    Counts distinct skeleton indicators in one scan (no lowercased copy) and
+    accepts large pages outright when they have few indicators and no JS
+    shell marker.
+    
+    Returns:
+        Tuple of (skeleton_count, verdict or None when a parse is needed)
+    """
+    if isinstance(html_content, bytes):
+        indicators, shell_markers = _SKELETON_INDICATORS_BYTES, _JS_SHELL_MARKERS_BYTES
+    else:
+        indicators, shell_markers = _SKELETON_INDICATORS, _JS_SHELL_MARKERS
+    
+    skeleton_count = len({match.lower() for match in indicators.findall(html_content)})
+    
+    if (
+        content_length > definitely_valid_length
+        and skeleton_count < 3
+        and not shell_markers.search(html_content)
+    ):
+        return skeleton_count, (False, "Valid content (length heuristic)")
+    return skeleton_count, None
+
+
+def _lexbor_single_string(node) -> bool:
+    """Lexbor equivalent of bs4's `tag.string is not None`: a chain of only children ending in text."""
+    child = node.child
+    while child is not None and child.next is None:
+        if child.tag in ('-text', '-comment'):
+            return True
+        child = child.child
+    return False
+
+
+def _content_digest(html_content: Union[str, bytes]) -> bytes:
+    """128-bit digest of a page body, used as its verdict cache key."""
+    if isinstance(html_content, bytes):
+        data = html_content
+    else:
+        data = html_content.encode('utf-8', 'surrogatepass')
+    if xxhash is not None:
+        return xxhash.xxh3_128_digest(data)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
 
 class ContentAnalyzer:
     """Analyzes HTML content to detect if it's blocked or skeleton content."""
     
+    # Pages at most this long that carry a JS shell marker are treated as
+    # certain to need JS rendering
+    JS_SHELL_MAX_LENGTH = 2048
+    
+    # Pages longer than this with few skeleton indicators and no JS shell
+    # marker are accepted without parsing
+    DEFINITELY_VALID_LENGTH = 200_000
+    
     def __init__(
         self,
         min_content_length: int = 1000,
         min_text_length: int = 200,
         min_meaningful_elements: int = 5,
-        text_to_markup_ratio: float = 0.001
+        text_to_markup_ratio: float = 0.001,
+        large_page_length: Optional[int] = 300_000
     ):
         """
         Initialize the content analyzer.
@@ -29,11 +150,14 @@ class ContentAnalyzer:
             min_text_length: Minimum text content length in characters
             min_meaningful_elements: Minimum number of meaningful elements (text, images, links)
             text_to_markup_ratio: Minimum ratio of text to HTML markup
+            large_page_length: 2xx responses longer than this skip analysis in
+                should_fallback (None to always analyze)
         """
         self.min_content_length = min_content_length
         self.min_text_length = min_text_length
         self.min_meaningful_elements = min_meaningful_elements
         self.text_to_markup_ratio = text_to_markup_ratio
+        self.large_page_length = large_page_length
     
     def is_blocked(self, status_code: int) -> bool:
         """
@@ -47,20 +171,105 @@ class ContentAnalyzer:
         """
         # 4xx and 5xx indicate blocking or errors
         if 400 <= status_code < 600:
-            logger.debug(f"Status code {status_code} indicates blocking")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Status code %s indicates blocking", status_code)
             return True
         return False
     
+    def _page_metrics(self, html_content: Union[str, bytes]) -> Tuple[int, int, int, int]:
+        """
+        Measure the parts of a page that skeleton detection looks at.
+        
+        Both backends walk the whole document with the same rules, so the
+        verdict doesn't depend on which parser is installed:
+        
+        - Text is every text node outside script/style (and template
+          contents), stripped; text_length matches
+          len(get_text(separator=' ', strip=True)) and text_chars leaves out
+          the separators.
+        - Meaningful elements are p/article/section/div tags that hold a
+          single string (bs4's tag.string is not None), plus images with a
+          src and links with an href.
+        
+        Returns:
+            Tuple of (text_length, text_chars, meaningful_elements, div_count)
+        """
+        text_length = text_parts = meaningful_elements = div_count = 0
+        
+        if LexborHTMLParser is not None:
+            root = LexborHTMLParser(html_content).root
+            # Lexbor keeps template contents out of the tree, like the bs4 walk below
+            nodes = root.traverse(include_text=True) if root is not None else ()
+            for node in nodes:
+                name = node.tag
+                if name == '-text':
+                    if node.parent.tag not in _NON_TEXT_PARENTS:
+                        stripped_length = len(node.text_content.strip())
+                        if stripped_length:
+                            text_length += stripped_length
+                            text_parts += 1
+                elif name in _TEXT_CONTAINER_TAGS:
+                    if name == 'div':
+                        div_count += 1
+                    if _lexbor_single_string(node):
+                        meaningful_elements += 1
+                elif name == 'img':
+                    if 'src' in node.attributes:
+                        meaningful_elements += 1
+                elif name == 'a':
+                    if 'href' in node.attributes:
+                        meaningful_elements += 1
+        else:
+            soup = BeautifulSoup(html_content, _HTML_PARSER)
+            template_tag = _TEMPLATE_TAG_BYTES if isinstance(html_content, bytes) else _TEMPLATE_TAG
+            if template_tag.search(html_content):
+                # Template contents are never rendered; emptying them leaves the
+                # same bare <template> element lexbor has in its tree
+                for template in soup.find_all('template'):
+                    template.clear()
+            # One walk accumulates every count instead of get_text() plus four find_all passes
+            node = soup.contents[0] if soup.contents else None
+            while node is not None:
+                if isinstance(node, Tag):
+                    name = node.name
+                    if name in _TEXT_CONTAINER_TAGS:
+                        if name == 'div':
+                            div_count += 1
+                        if node.string is not None:
+                            meaningful_elements += 1
+                    elif name == 'img':
+                        if node.get('src') is not None:
+                            meaningful_elements += 1
+                    elif name == 'a':
+                        if node.get('href') is not None:
+                            meaningful_elements += 1
+                # bs4 gives script/style strings their own types, so this is
+                # the same "outside script/style" rule as the lexbor walk
+                elif type(node) in _TEXT_STRING_TYPES:
+                    stripped_length = len(node.strip())
+                    if stripped_length:
+                        text_length += stripped_length
+                        text_parts += 1
+                node = node.next_element
+        
+        text_chars = text_length
+        # get_text(separator=' ', strip=True) joins the stripped parts with single spaces
+        text_length += max(text_parts - 1, 0)
+        return text_length, text_chars, meaningful_elements, div_count
+    
     def is_skeleton_content(
         self,
-        html_content: str,
+        html_content: Union[str, bytes],
         status_code: int = 200
     ) -> Tuple[bool, str]:
         """
         Analyze HTML content to determine if it's skeleton/placeholder content.
         
+        Verdicts are cached by content digest and analyzer thresholds, so an
+        identical body seen again (retries, duplicate URLs) is not re-parsed.
+        
         Args:
-            html_content: HTML content to analyze
+            html_content: HTML content to analyze, decoded or as raw response bytes
             status_code: HTTP status code (default: 200)
             
         Returns:
@@ -72,82 +281,106 @@ class ContentAnalyzer:
         # Check content length
         content_length = len(html_content)
         if content_length < self.min_content_length:
-            logger.debug(f"Content length {content_length} below threshold {self.min_content_length}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Content length %s below threshold %s", content_length, self.min_content_length)
             return True, f"Content too short ({content_length} bytes)"
         
+        key = (
+            _content_digest(html_content),
+            status_code,
+            self.min_content_length,
+            self.min_text_length,
+            self.min_meaningful_elements,
+            self.text_to_markup_ratio,
+            self.DEFINITELY_VALID_LENGTH
+        )
+        with _VERDICT_CACHE_LOCK:
+            verdict = _VERDICT_CACHE.get(key)
+            if verdict is not None:
+                _VERDICT_CACHE.move_to_end(key)
+                return verdict
+        
+        # Analyzed outside the lock; a concurrent miss on the same page just
+        # stores the same verdict twice
+        verdict = self._analyze_skeleton(html_content, content_length)
+        with _VERDICT_CACHE_LOCK:
+            _VERDICT_CACHE[key] = verdict
+            if len(_VERDICT_CACHE) > _VERDICT_CACHE_SIZE:
+                _VERDICT_CACHE.popitem(last=False)
+        return verdict
+    
+    def _analyze_skeleton(
+        self,
+        html_content: Union[str, bytes],
+        content_length: int
+    ) -> Tuple[bool, str]:
+        """Uncached body of is_skeleton_content for content past the length check."""
+        # Thresholds as locals; several are read more than once below
+        min_text_length = self.min_text_length
+        min_meaningful_elements = self.min_meaningful_elements
+        text_to_markup_ratio = self.text_to_markup_ratio
+        
+        skeleton_count, verdict = _prescreen_skeleton(
+            html_content, content_length, self.DEFINITELY_VALID_LENGTH
+        )
+        if verdict is not None:
+            return verdict
+        
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            text_length, text_chars, meaningful_elements, div_count = self._page_metrics(html_content)
         except Exception as e:
-            logger.warning(f"Failed to parse HTML: {e}")
+            logger.warning("Failed to parse HTML: %s", e)
             # If we can't parse, but content is long enough, assume it's valid
             if content_length >= self.min_content_length:
                 return False, "Valid content (unparseable but sufficient length)"
             return True, f"Unparseable content: {e}"
         
-        # Extract text content
-        text_content = soup.get_text(separator=' ', strip=True)
-        text_length = len(text_content)
-        
         # Check text length
-        if text_length < self.min_text_length:
-            logger.debug(f"Text length {text_length} below threshold {self.min_text_length}")
+        if text_length < min_text_length:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Text length %s below threshold %s", text_length, min_text_length)
             return True, f"Text content too short ({text_length} chars)"
         
-        # Count meaningful elements
-        meaningful_elements = (
-            len(soup.find_all(['p', 'article', 'section', 'div'], string=True)) +
-            len(soup.find_all('img', src=True)) +
-            len(soup.find_all('a', href=True))
-        )
-        
-        if meaningful_elements < self.min_meaningful_elements:
-            logger.debug(f"Meaningful elements {meaningful_elements} below threshold {self.min_meaningful_elements}")
+        if meaningful_elements < min_meaningful_elements:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Meaningful elements %s below threshold %s", meaningful_elements, min_meaningful_elements)
             return True, f"Too few meaningful elements ({meaningful_elements})"
         
         # Check text-to-markup ratio (be more lenient for large pages)
-        markup_length = len(html_content) - text_length
+        # Only the text actually present in the page counts against its length
+        markup_length = content_length - text_chars
         if markup_length > 0:
-            ratio = text_length / markup_length
+            ratio = text_chars / markup_length
             
             # For large pages (>100KB), use a more lenient threshold
             # Modern web pages (especially e-commerce) have lots of markup
-            effective_threshold = self.text_to_markup_ratio
+            effective_threshold = text_to_markup_ratio
             if content_length > 100000:  # 100KB
-                effective_threshold = self.text_to_markup_ratio * 0.5  # Half the threshold for large pages
+                effective_threshold = text_to_markup_ratio * 0.5  # Half the threshold for large pages
             
             if ratio < effective_threshold:
                 # Only fail if ratio is very low AND content is small
                 # Large pages with low ratio are often valid (e.g., Amazon, modern SPAs)
                 if content_length < 50000:  # Only strict check for smaller pages
-                    logger.debug(f"Text-to-markup ratio {ratio:.4f} below threshold {effective_threshold}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Text-to-markup ratio %.4f below threshold %s", ratio, effective_threshold)
                     return True, f"Low text-to-markup ratio ({ratio:.4f})"
                 else:
                     # Large page with low ratio - likely valid, just log it
-                    logger.debug(f"Large page with low text-to-markup ratio {ratio:.4f}, but content size suggests it's valid")
-        
-        # Check for common skeleton indicators
-        skeleton_indicators = [
-            'loading',
-            'skeleton',
-            'placeholder',
-            'spinner',
-            'shimmer',
-            'pulse'
-        ]
-        
-        html_lower = html_content.lower()
-        skeleton_count = sum(1 for indicator in skeleton_indicators if indicator in html_lower)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Large page with low text-to-markup ratio %.4f, but content size suggests it's valid", ratio)
         
         # If many skeleton indicators and low content, likely skeleton
-        if skeleton_count >= 3 and text_length < self.min_text_length * 2:
-            logger.debug(f"Found {skeleton_count} skeleton indicators with low content")
+        if skeleton_count >= 3 and text_length < min_text_length * 2:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Found %s skeleton indicators with low content", skeleton_count)
             return True, f"Multiple skeleton indicators ({skeleton_count})"
         
         # Check for minimal content patterns (lots of divs, little text)
-        divs = soup.find_all('div')
-        if len(divs) > 20 and text_length < self.min_text_length * 3:
-            logger.debug(f"Many divs ({len(divs)}) but little text ({text_length})")
-            return True, f"Layout-heavy, content-light ({len(divs)} divs, {text_length} chars)"
+        if div_count > 20 and text_length < min_text_length * 3:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Many divs (%s) but little text (%s)", div_count, text_length)
+            return True, f"Layout-heavy, content-light ({div_count} divs, {text_length} chars)"
         
         return False, "Valid content"
     
@@ -200,13 +433,13 @@ class ContentAnalyzer:
             url_lower = url.lower()
             for domain in whitelisted_domains:
                 if domain in url_lower:
-                    logger.debug(f"Skipping skeleton detection for whitelisted domain ({domain}): {url}")
+                    logger.debug("Skipping skeleton detection for whitelisted domain (%s): %s", domain, url)
                     return False, f"{domain} - accepting custom JS result"
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, _HTML_PARSER)
         except Exception as e:
-            logger.warning(f"Failed to parse HTML for custom JS skeleton check: {e}")
+            logger.warning("Failed to parse HTML for custom JS skeleton check: %s", e)
             return False, "Unparseable content, assuming valid"
         
         html_lower = html_content.lower()
@@ -227,7 +460,7 @@ class ContentAnalyzer:
         
         for pattern in no_results_patterns:
             if re.search(pattern, html_lower):
-                logger.debug(f"Found 'no results' pattern: {pattern}")
+                logger.debug("Found 'no results' pattern: %s", pattern)
                 return True, f"Found 'no results' message"
         
         # 2. Extract and check JSON data from script tags
@@ -254,7 +487,7 @@ class ContentAnalyzer:
             
             for pattern in json_patterns:
                 if re.search(pattern, script_content):
-                    logger.debug(f"Found empty product listing pattern: {pattern}")
+                    logger.debug("Found empty product listing pattern: %s", pattern)
                     return True, f"Empty product listing detected"
             
             # Try to parse as JSON and check for empty arrays
@@ -309,7 +542,7 @@ class ContentAnalyzer:
             
             # If text is very short, it's likely skeleton
             if text_length < 500:
-                logger.debug(f"Has navigation but no products and minimal text ({text_length} chars)")
+                logger.debug("Has navigation but no products and minimal text (%s chars)", text_length)
                 return True, f"Navigation present but no products and minimal content"
             
             # Check for error/empty state messages in visible text
@@ -327,7 +560,7 @@ class ContentAnalyzer:
         
         # If lots of structure but little content, might be skeleton
         if structural_elements > 50 and content_elements < 5 and text_length < 1000:
-            logger.debug(f"Structure-heavy ({structural_elements} divs) but content-light ({content_elements} content elements, {text_length} chars)")
+            logger.debug("Structure-heavy (%s divs) but content-light (%s content elements, %s chars)", structural_elements, content_elements, text_length)
             return True, f"Structure-heavy but content-light page"
         
         # 5. Check for loading/error states in class names or IDs
@@ -341,34 +574,64 @@ class ContentAnalyzer:
                 style = indicator.get('style', '')
                 classes = ' '.join(indicator.get('class', []))
                 if 'display: none' not in style.lower() and 'hidden' not in classes.lower():
-                    logger.debug(f"Found visible loading/error indicator")
+                    logger.debug("Found visible loading/error indicator")
                     return True, f"Visible loading/error state detected"
         
         return False, "Valid content"
     
+    def needs_js_rendering(self, html_content: Optional[str]) -> Tuple[bool, str]:
+        """
+        High-confidence check that a page is a client-rendered shell.
+        
+        Such pages will not be recovered by XHR probing, so callers can go
+        straight to JS rendering. Only small pages with an explicit shell
+        marker qualify; anything else is left to the regular fallback chain.
+        
+        Args:
+            html_content: HTML content from a static fetch
+            
+        Returns:
+            Tuple of (needs_js: bool, reason: str)
+        """
+        if not html_content or len(html_content) > self.JS_SHELL_MAX_LENGTH:
+            return False, "Not a small page"
+        match = _JS_SHELL_MARKERS.search(html_content)
+        if match:
+            return True, f"JS app shell ({match.group(0)[:40]!r})"
+        return False, "No JS shell markers"
+    
     def should_fallback(
         self,
-        html_content: Optional[str],
+        html_content: Optional[Union[str, bytes]],
         status_code: int
     ) -> Tuple[bool, str]:
         """
         Determine if we should fallback to next method.
         
         Args:
-            html_content: HTML content (None if request failed)
+            html_content: HTML content or raw response bytes (None if request failed)
             status_code: HTTP status code
             
         Returns:
             Tuple of (should_fallback: bool, reason: str)
         """
-        # Check if blocked
-        if self.is_blocked(status_code):
+        # Check if blocked (is_blocked inlined; this runs per URL per tier)
+        if 400 <= status_code < 600:
             return True, f"Request blocked (status {status_code})"
         
         # If no content, fallback
         if html_content is None:
             return True, "No content received"
         
+        # Large 2xx pages are almost always real content; skip all analysis
+        large_page_length = self.large_page_length
+        if (
+            large_page_length is not None
+            and 200 <= status_code < 300
+            and len(html_content) > large_page_length
+        ):
+            return False, "Content large and OK"
+        
         # Check if skeleton
         is_skeleton, reason = self.is_skeleton_content(html_content, status_code)
         if is_skeleton:
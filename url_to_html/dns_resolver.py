@@ -0,0 +1,151 @@
+"""
+DNS helpers for aiohttp connectors.
+Resolve every host of a batch once up front and pin the answers so new
+connections never wait on getaddrinfo.
+"""
+
+import logging
+import asyncio
+import socket
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+logger = logging.getLogger(__name__)
+
+# Seconds the connector keeps resolved hosts, and PinnedResolver its pins
+# (aiohttp default is 10). Short enough that CDN rotation and failover are
+# picked up by long-lived sessions
+DNS_CACHE_TTL = 300
+
+
+# Nameservers queried alongside the system resolver. Empty by default: public
+# resolvers see every hostname looked up and can't answer split-horizon names,
+# so replicas are opt-in (BatchFetcherConfig.dns_replica_nameservers)
+REPLICA_NAMESERVERS: Tuple[str, ...] = ()
+
+
+def build_resolver(nameservers: Iterable[str] = REPLICA_NAMESERVERS) -> AbstractResolver:
+    """
+    Return the resolver for a connector.
+    
+    Without replica nameservers this is the system resolver (getaddrinfo on a
+    thread). With them, each lookup is raced across the replicas and the
+    system resolver when aiodns is installed.
+    
+    Args:
+        nameservers: Extra nameserver IPs to query (default: none)
+    """
+    nameservers = tuple(nameservers)
+    if not nameservers:
+        return aiohttp.ThreadedResolver()
+    try:
+        return ReplicatedResolver(nameservers)
+    except RuntimeError:
+        # aiodns not installed
+        return aiohttp.ThreadedResolver()
+
+
+class ReplicatedResolver(AbstractResolver):
+    """Send each lookup to several resolvers and return the first successful answer."""
+
+    def __init__(self, nameservers: Iterable[str] = REPLICA_NAMESERVERS):
+        """
+        Initialize the resolver.
+
+        Args:
+            nameservers: Nameserver IPs to query in addition to the system resolver
+
+        Raises:
+            RuntimeError: If aiodns is not installed
+        """
+        self._resolvers: List[AbstractResolver] = [
+            aiohttp.AsyncResolver(nameservers=[nameserver]) for nameserver in nameservers
+        ]
+        self._resolvers.append(aiohttp.AsyncResolver())
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC) -> List[Dict]:
+        pending = {
+            asyncio.ensure_future(resolver.resolve(host, port, family))
+            for resolver in self._resolvers
+        }
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def close(self):
+        await asyncio.gather(*(resolver.close() for resolver in self._resolvers))
+
+
+class PinnedResolver(AbstractResolver):
+    """Resolver that serves pre-warmed answers and delegates everything else."""
+
+    def __init__(self, resolver: Optional[AbstractResolver] = None, ttl: float = DNS_CACHE_TTL):
+        """
+        Initialize the resolver.
+
+        Args:
+            resolver: Underlying resolver (default: build_resolver())
+            ttl: Seconds a pinned answer is served before lookups fall through
+                to the underlying resolver again (default: DNS_CACHE_TTL)
+        """
+        self._resolver = resolver or build_resolver()
+        self._ttl = ttl
+        # (host, port, family) -> (time.monotonic() expiry, answer)
+        self._pinned: Dict[Tuple[str, int, int], Tuple[float, List[Dict]]] = {}
+
+    async def warm(self, urls: Iterable[str], family: int = socket.AF_UNSPEC):
+        """
+        Resolve the distinct host/port pairs of urls concurrently and pin the results.
+
+        Hosts with an unexpired pin are skipped; expired pins are refreshed.
+        Lookup failures are logged and left for the connector to retry.
+        """
+        targets = set()
+        for url in urls:
+            parsed = urlparse(url)
+            if parsed.hostname:
+                port = parsed.port or (80 if parsed.scheme == "http" else 443)
+                targets.add((parsed.hostname, port, family))
+        now = time.monotonic()
+        targets = [
+            target for target in targets
+            if target not in self._pinned or self._pinned[target][0] <= now
+        ]
+        if not targets:
+            return
+        results = await asyncio.gather(
+            *(self._resolver.resolve(*target) for target in targets),
+            return_exceptions=True
+        )
+        expires = time.monotonic() + self._ttl
+        for target, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.debug(f"DNS pre-resolve failed for {target[0]}: {result}")
+            else:
+                self._pinned[target] = (expires, result)
+        logger.debug(f"Pre-resolved {len(self._pinned)} host/port pairs")
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC) -> List[Dict]:
+        key = (host, port, family)
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            if pinned[0] > time.monotonic():
+                return pinned[1]
+            # Stale; the host may have moved, so ask the real resolver
+            del self._pinned[key]
+        return await self._resolver.resolve(host, port, family)
+
+    async def close(self):
+        await self._resolver.close()
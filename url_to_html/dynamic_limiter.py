@@ -0,0 +1,87 @@
+"""
+Resizable admission control for async workers.
+Like asyncio.Semaphore, but the limit can be changed while slots are held.
+"""
+
+import logging
+import asyncio
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DynamicLimiter:
+    """Counter + condition based concurrency limiter with a runtime-adjustable limit."""
+    
+    def __init__(
+        self,
+        limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None
+    ):
+        """
+        Initialize the limiter.
+        
+        Args:
+            limit: Initial number of concurrent holders allowed
+            min_limit: Lowest limit resize() will apply (default: 1)
+            max_limit: Highest limit resize() will apply (default: initial limit)
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit if max_limit is not None else limit
+        self._limit = limit
+        self._in_use = 0
+        # Created on first use so the limiter can be built outside a running loop
+        self._condition: Optional[asyncio.Condition] = None
+    
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit."""
+        return self._limit
+    
+    @property
+    def in_use(self) -> int:
+        """Number of slots currently held."""
+        return self._in_use
+    
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    async def acquire(self):
+        """Wait until a slot is free and take it."""
+        condition = self._get_condition()
+        async with condition:
+            while self._in_use >= self._limit:
+                await condition.wait()
+            self._in_use += 1
+    
+    async def release(self):
+        """Return a slot and wake one waiter."""
+        condition = self._get_condition()
+        async with condition:
+            self._in_use -= 1
+            condition.notify(1)
+    
+    async def resize(self, limit: int):
+        """
+        Change the limit, clamped to [min_limit, max_limit].
+        
+        Shrinking never interrupts current holders; new acquirers simply wait
+        until enough slots have been released.
+        """
+        limit = max(self.min_limit, min(limit, self.max_limit))
+        condition = self._get_condition()
+        async with condition:
+            if limit != self._limit:
+                logger.debug(f"Resizing limiter from {self._limit} to {limit}")
+                self._limit = limit
+                condition.notify_all()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
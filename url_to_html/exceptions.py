@@ -40,10 +40,9 @@ class BlockedError(FetchError):
         super().__init__(message, url)
     
     def __str__(self):
-        base_msg = super().__str__()
-        if self.status_code:
-            return f"{base_msg} (Status: {self.status_code})"
-        return base_msg
+        url_part = f" (URL: {self.url})" if self.url else ""
+        status_code_part = f" (Status: {self.status_code})" if self.status_code else ""
+        return f"{self.message}{url_part}{status_code_part}"
 
 
 class SkeletonContentError(FetchError):
@@ -62,10 +61,9 @@ class SkeletonContentError(FetchError):
         super().__init__(message, url)
     
     def __str__(self):
-        base_msg = super().__str__()
-        if self.reason:
-            return f"{base_msg} (Reason: {self.reason})"
-        return base_msg
+        url_part = f" (URL: {self.url})" if self.url else ""
+        reason_part = f" (Reason: {self.reason})" if self.reason else ""
+        return f"{self.message}{url_part}{reason_part}"
 
 
 class TimeoutError(FetchError):
@@ -84,10 +82,9 @@ class TimeoutError(FetchError):
         super().__init__(message, url)
     
     def __str__(self):
-        base_msg = super().__str__()
-        if self.timeout:
-            return f"{base_msg} (Timeout: {self.timeout}s)"
-        return base_msg
+        url_part = f" (URL: {self.url})" if self.url else ""
+        timeout_part = f" (Timeout: {self.timeout}s)" if self.timeout else ""
+        return f"{self.message}{url_part}{timeout_part}"
 
 
 class InvalidURLError(FetchError):
@@ -120,8 +117,28 @@ class JSRenderError(FetchError):
         super().__init__(message, url)
     
     def __str__(self):
-        base_msg = super().__str__()
-        if self.api_endpoint:
-            return f"{base_msg} (API: {self.api_endpoint})"
-        return base_msg
+        url_part = f" (URL: {self.url})" if self.url else ""
+        api_endpoint_part = f" (API: {self.api_endpoint})" if self.api_endpoint else ""
+        return f"{self.message}{url_part}{api_endpoint_part}"
 
+
+
+class ResponseTooLargeError(FetchError):
+    """Raised when a response body exceeds the fetcher's size cap."""
+    
+    def __init__(self, message: str = "", url: str = "", max_bytes: int = 0):
+        """
+        Initialize response too large error.
+        
+        Args:
+            message: Error message
+            url: URL whose response was too large
+            max_bytes: Size cap in bytes that was exceeded
+        """
+        self.max_bytes = max_bytes
+        super().__init__(message, url)
+    
+    def __str__(self):
+        url_part = f" (URL: {self.url})" if self.url else ""
+        max_bytes_part = f" (Limit: {self.max_bytes} bytes)" if self.max_bytes else ""
+        return f"{self.message}{url_part}{max_bytes_part}"
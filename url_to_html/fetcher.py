@@ -4,9 +4,13 @@ Main fetcher with three-tier fallback strategy.
 
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, quote
-from typing import Optional, Dict, Any
-from .static_fetcher import StaticFetcher
+from typing import Optional, Dict, Any, Tuple, Union
+from .static_fetcher import StaticFetcher, decode_content
 from .xhr_fetcher import XHRFetcher
 from .js_renderer import JSrend
 from .content_analyzer import ContentAnalyzer
@@ -14,13 +18,101 @@ from .exceptions import FetchError, JSRenderError, TimeoutError
 
 logger = logging.getLogger(__name__)
 
+# Output files are written here so fetch_html doesn't wait on disk I/O;
+# pending writes still finish before the interpreter exits
+_SAVE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="url_to_html-save")
 
-def _save_html_to_file(html_content: str, url: str, method: str, output_dir: str = "outputs") -> str:
+# Maps every Latin-1 character that isn't alphanumeric, '_' or '-' to '_'
+_FILENAME_TABLE = {
+    code: '_' for code in range(256)
+    if not (chr(code).isalnum() or chr(code) in '_-')
+}
+
+
+# (StaticFetcher, XHRFetcher, ContentAnalyzer) per distinct FetcherConfig setup,
+# so repeated fetch_html calls reuse their components. Least recently used
+# first; each entry holds sessions and a probe pool, so the oldest is closed
+# once there are more than _COMPONENT_CACHE_SIZE setups
+_COMPONENT_CACHE: "OrderedDict[tuple, Tuple[StaticFetcher, XHRFetcher, ContentAnalyzer]]" = OrderedDict()
+_COMPONENT_CACHE_SIZE = 16
+_COMPONENT_CACHE_LOCK = threading.Lock()
+
+
+def _get_components(config: "FetcherConfig") -> Tuple[StaticFetcher, XHRFetcher, ContentAnalyzer]:
+    """Return cached fetch components for the settings in config, building them on first use."""
+    key = (
+        config.static_timeout,
+        tuple(sorted(config.static_headers.items())),
+        config.xhr_timeout,
+        tuple(sorted(config.xhr_headers.items())),
+        config.min_content_length,
+        config.min_text_length,
+        config.min_meaningful_elements,
+        config.text_to_markup_ratio
+    )
+    evicted = []
+    with _COMPONENT_CACHE_LOCK:
+        components = _COMPONENT_CACHE.get(key)
+        if components is not None:
+            _COMPONENT_CACHE.move_to_end(key)
+            return components
+        components = (
+            StaticFetcher(
+                timeout=config.static_timeout,
+                headers=config.static_headers
+            ),
+            XHRFetcher(
+                timeout=config.xhr_timeout,
+                headers=config.xhr_headers
+            ),
+            ContentAnalyzer(
+                min_content_length=config.min_content_length,
+                min_text_length=config.min_text_length,
+                min_meaningful_elements=config.min_meaningful_elements,
+                text_to_markup_ratio=config.text_to_markup_ratio
+            )
+        )
+        _COMPONENT_CACHE[key] = components
+        while len(_COMPONENT_CACHE) > _COMPONENT_CACHE_SIZE:
+            evicted.append(_COMPONENT_CACHE.popitem(last=False)[1])
+    # Closed outside the lock so other lookups don't wait on it
+    for static_fetcher, xhr_fetcher, _ in evicted:
+        static_fetcher.close()
+        xhr_fetcher.close()
+    return components
+
+
+def fetch_html_clear_cache():
+    """Drop the components cached by fetch_html (mainly for tests)."""
+    with _COMPONENT_CACHE_LOCK:
+        cached = list(_COMPONENT_CACHE.values())
+        _COMPONENT_CACHE.clear()
+    for static_fetcher, xhr_fetcher, _ in cached:
+        static_fetcher.close()
+        xhr_fetcher.close()
+
+
+def shutdown(wait: bool = True):
+    """
+    Stop the background output writer.
+    
+    Args:
+        wait: Block until queued output files have been written
+    """
+    _SAVE_POOL.shutdown(wait=wait)
+
+
+def _save_html_to_file(
+    html_content: Union[str, bytes],
+    url: str,
+    method: str,
+    output_dir: str = "outputs"
+) -> str:
     """
     Save HTML content to a file for verification.
     
     Args:
-        html_content: HTML content to save
+        html_content: HTML content to save (raw bytes are written as-is)
         url: Original URL
         method: Method used (static, xhr, js)
         output_dir: Directory to save files in
@@ -28,38 +120,37 @@ def _save_html_to_file(html_content: str, url: str, method: str, output_dir: str
     Returns:
         Path to saved file
     """
-    # Create output directory if it doesn't exist
+    # Checked on every write (one stat when it exists), so a directory
+    # removed mid-run is recreated instead of failing later saves
     os.makedirs(output_dir, exist_ok=True)
     
     # Create a safe filename from URL
     parsed = urlparse(url)
-    domain = parsed.netloc.replace('.', '_')
-    path = parsed.path.replace('/', '_').strip('_') or 'index'
-    query = parsed.query.replace('&', '_').replace('=', '_') if parsed.query else ''
+    path = parsed.path.strip('/') or 'index'
+    filename_base = f"{parsed.netloc}_{path}"
+    if parsed.query:
+        filename_base += f"_{parsed.query[:50]}"
     
-    # Limit filename length
-    filename_base = f"{domain}_{path}"
-    if query:
-        filename_base += f"_{query[:50]}"
-    filename_base = filename_base[:100]  # Limit total length
+    # Make filename safe and limit its length
+    filename_base = filename_base.translate(_FILENAME_TABLE)[:100]
     
     # Add method and timestamp
-    import time
     timestamp = int(time.time())
     filename = f"{method}_{filename_base}_{timestamp}.html"
     
-    # Make filename safe
-    filename = "".join(c for c in filename if c.isalnum() or c in ('_', '-', '.'))
-    
     filepath = os.path.join(output_dir, filename)
     
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        logger.info(f"Saved {method} output to: {filepath}")
+        if isinstance(html_content, bytes):
+            with open(filepath, 'wb') as f:
+                f.write(html_content)
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+        logger.info("Saved %s output to: %s", method, filepath)
         return filepath
     except Exception as e:
-        logger.warning(f"Failed to save {method} output: {e}")
+        logger.warning("Failed to save %s output: %s", method, e)
         return ""
 
 
@@ -163,52 +254,38 @@ def fetch_html(
             if hasattr(config, key):
                 setattr(config, key, value)
     
-    # Initialize components
-    static_fetcher = StaticFetcher(
-        timeout=config.static_timeout,
-        headers=config.static_headers
-    )
-    
-    xhr_fetcher = XHRFetcher(
-        timeout=config.xhr_timeout,
-        headers=config.xhr_headers
-    )
-    
-    content_analyzer = ContentAnalyzer(
-        min_content_length=config.min_content_length,
-        min_text_length=config.min_text_length,
-        min_meaningful_elements=config.min_meaningful_elements,
-        text_to_markup_ratio=config.text_to_markup_ratio
-    )
+    # Initialize components (reused across calls with the same settings)
+    static_fetcher, xhr_fetcher, content_analyzer = _get_components(config)
     
-    logger.info(f"Starting fetch for URL: {url}")
+    logger.info("Starting fetch for URL: %s", url)
     
     # Tier 1: Static Fetch
     try:
         logger.info("Tier 1: Attempting static fetch")
-        html_content, status_code = static_fetcher.fetch(url)
+        # Raw bytes are saved and analyzed as-is; only a page we return is decoded
+        raw_content, encoding, status_code = static_fetcher.fetch_bytes(url)
         
-        if html_content is not None:
+        if raw_content is not None:
             # Save static fetch output for verification
             if config.save_outputs:
-                _save_html_to_file(html_content, url, "static", config.output_dir)
+                _SAVE_POOL.submit(_save_html_to_file, raw_content, url, "static", config.output_dir)
             
             should_fallback, reason = content_analyzer.should_fallback(
-                html_content, status_code
+                raw_content, status_code
             )
             
             if not should_fallback:
                 logger.info("Static fetch successful, content is valid")
-                return html_content
+                return decode_content(raw_content, encoding)
             else:
-                logger.info(f"Static fetch returned insufficient content: {reason}")
+                logger.info("Static fetch returned insufficient content: %s", reason)
         else:
             logger.info("Static fetch returned no content")
     
     except (TimeoutError, FetchError) as e:
-        logger.warning(f"Static fetch failed: {e}")
+        logger.warning("Static fetch failed: %s", e)
     except Exception as e:
-        logger.warning(f"Static fetch unexpected error: {e}")
+        logger.warning("Static fetch unexpected error: %s", e)
     
     # Tier 2: XHR Fetch
     try:
@@ -218,7 +295,7 @@ def fetch_html(
         if html_content is not None:
             # Save XHR fetch output for verification
             if config.save_outputs:
-                _save_html_to_file(html_content, url, "xhr", config.output_dir)
+                _SAVE_POOL.submit(_save_html_to_file, html_content, url, "xhr", config.output_dir)
             
             should_fallback, reason = content_analyzer.should_fallback(
                 html_content, status_code
@@ -228,12 +305,12 @@ def fetch_html(
                 logger.info("XHR fetch successful, content is valid")
                 return html_content
             else:
-                logger.info(f"XHR fetch returned insufficient content: {reason}")
+                logger.info("XHR fetch returned insufficient content: %s", reason)
         else:
             logger.info("XHR fetch returned no content")
     
     except Exception as e:
-        logger.warning(f"XHR fetch failed: {e}")
+        logger.warning("XHR fetch failed: %s", e)
     
     # Tier 3: JS Rendering
     try:
@@ -254,21 +331,21 @@ def fetch_html(
         if html_content:
             # Save JS rendering output for verification
             if config.save_outputs:
-                _save_html_to_file(html_content, url, "js", config.output_dir)
+                _SAVE_POOL.submit(_save_html_to_file, html_content, url, "js", config.output_dir)
             
-            logger.info(f"JS rendering successful: {len(html_content)} bytes")
+            logger.info("JS rendering successful: %s bytes", len(html_content))
             return html_content
         else:
             logger.warning("JS rendering returned empty content")
     
     except JSRenderError as e:
         # If JS rendering is required but not configured, stop here
-        logger.error(f"JS rendering failed: {e}")
+        logger.error("JS rendering failed: %s", e)
         print(f"\nJS rendering required for: {url}")
         print("Please configure js_api_endpoint in FetcherConfig to enable JS rendering.")
         raise  # Re-raise to stop execution
     except Exception as e:
-        logger.error(f"JS rendering unexpected error: {e}")
+        logger.error("JS rendering unexpected error: %s", e)
     
     # All methods failed
     error_msg = (
@@ -4,7 +4,7 @@ Result aggregation and summary generation.
 
 import logging
 from typing import List, Dict, Optional
-from collections import defaultdict
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +14,12 @@ class ResultAggregator:
     
     def __init__(self):
         """Initialize the result aggregator."""
-        self.results: List[Dict[str, any]] = []
+        # One list per field (struct of arrays); row i across them is one result
+        self.urls: List[str] = []
+        self.htmls: List[Optional[str]] = []
+        self.methods: List[Optional[str]] = []
+        self.statuses: List[str] = []
+        self.errors: List[Optional[str]] = []
     
     def add_result(
         self,
@@ -34,13 +39,11 @@ class ResultAggregator:
             status: Status (success or failed)
             error: Error message if failed
         """
-        self.results.append({
-            "url": url,
-            "html": html,
-            "method": method,
-            "status": status,
-            "error": error
-        })
+        self.urls.append(url)
+        self.htmls.append(html)
+        self.methods.append(method)
+        self.statuses.append(status)
+        self.errors.append(error)
     
     def add_results(self, results: List[Dict[str, any]]):
         """
@@ -49,7 +52,30 @@ class ResultAggregator:
         Args:
             results: List of result dictionaries
         """
-        self.results.extend(results)
+        for r in results:
+            self.add_result(
+                url=r["url"],
+                html=r.get("html"),
+                method=r.get("method"),
+                status=r["status"],
+                error=r.get("error")
+            )
+    
+    @property
+    def results(self) -> List[Dict[str, any]]:
+        """Results as a list of dictionaries, rebuilt from the field lists."""
+        return [
+            {
+                "url": url,
+                "html": html,
+                "method": method,
+                "status": status,
+                "error": error
+            }
+            for url, html, method, status, error in zip(
+                self.urls, self.htmls, self.methods, self.statuses, self.errors
+            )
+        ]
     
     def get_summary(self) -> Dict[str, any]:
         """
@@ -58,15 +84,13 @@ class ResultAggregator:
         Returns:
             Summary dictionary with statistics
         """
-        total = len(self.results)
-        successful = sum(1 for r in self.results if r["status"] == "success")
+        total = len(self.statuses)
+        status_counts = Counter(self.statuses)
+        successful = status_counts["success"]
         failed = total - successful
         
         # Count by method
-        by_method = defaultdict(int)
-        for r in self.results:
-            if r["method"]:
-                by_method[r["method"]] += 1
+        by_method = Counter(method for method in self.methods if method)
         
         # Count JS batches (approximate - count custom_js results)
         custom_js_count = by_method.get("custom_js", 0)
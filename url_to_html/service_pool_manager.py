@@ -5,7 +5,10 @@ Tracks availability, cooldowns, and distributes batches across services.
 
 import logging
 import asyncio
+import heapq
+import itertools
 import time
+from collections import Counter, deque
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
@@ -29,16 +32,16 @@ class ServiceInfo:
     cooldown_until: float = 0.0
     last_batch_time: float = 0.0
     failure_count: int = 0
+    # URLs to send per batch; tuned by ServicePoolManager.record_batch_outcome
+    batch_size: int = 0
+    # Batches currently being rendered by this service
+    in_flight: int = 0
     
     def is_available(self) -> bool:
         """Check if service is currently available."""
-        if self.status == ServiceStatus.AVAILABLE:
-            return True
-        if self.status == ServiceStatus.COOLDOWN:
-            if time.time() >= self.cooldown_until:
-                self.status = ServiceStatus.AVAILABLE
-                return True
-        return False
+        # Cooldowns are ended by ServicePoolManager's expiry timer, so the
+        # status is always current
+        return self.status == ServiceStatus.AVAILABLE
 
 
 class ServicePoolManager:
@@ -48,7 +51,8 @@ class ServicePoolManager:
         self,
         service_endpoints: List[str],
         batch_size: int = 20,
-        cooldown_seconds: int = 120
+        cooldown_seconds: int = 120,
+        max_in_flight: int = 1
     ):
         """
         Initialize the service pool manager.
@@ -56,59 +60,184 @@ class ServicePoolManager:
         Args:
             service_endpoints: List of service endpoint URLs
             batch_size: Number of URLs per batch (default: 20)
-            cooldown_seconds: Cooldown period after each batch (default: 120)
+            cooldown_seconds: Min seconds between batch starts on one service (default: 120)
+            max_in_flight: Concurrent batches one service may take (default: 1)
         """
         self.services = [
             ServiceInfo(
                 endpoint=f"https://{endpoint}/render" if not endpoint.startswith("http") else endpoint,
-                status=ServiceStatus.AVAILABLE
+                status=ServiceStatus.AVAILABLE,
+                batch_size=batch_size
             )
             for endpoint in service_endpoints
         ]
         self.batch_size = batch_size
+        # Per-service batch sizes adapt between 1 and twice the configured size
+        self.max_batch_size = batch_size * 2
         self.cooldown_seconds = cooldown_seconds
+        self.max_in_flight = max_in_flight
         self.lock = asyncio.Lock()
+        # EWMA of batch round-trip time per endpoint; unmeasured services count as 0
+        # so each one gets tried before latency decides
+        self.latency_alpha = 0.3
+        self.latency_ewma: Dict[str, float] = {}
+        # Scan order; the chosen service is rotated to the back so ties between
+        # services are broken round-robin
+        self._rr = deque(self.services)
+        # Set while some service may be available; created on first use so the
+        # manager can be built outside a running loop
+        self._service_available: Optional[asyncio.Event] = None
+        # (cooldown_until, seq, service) min-heap; seq breaks ties since
+        # ServiceInfo is not orderable
+        self._cooldown_heap: List[Tuple[float, int, ServiceInfo]] = []
+        self._cooldown_seq = itertools.count()
         
         logger.info(f"Initialized service pool with {len(self.services)} services")
     
+    def _get_available_event(self) -> asyncio.Event:
+        if self._service_available is None:
+            self._service_available = asyncio.Event()
+            self._service_available.set()
+        return self._service_available
+    
+    def _can_accept(self, service: ServiceInfo) -> bool:
+        """Whether service can take another batch now."""
+        if service.status == ServiceStatus.PROCESSING:
+            return service.in_flight < self.max_in_flight
+        return service.is_available()
+    
+    def _refresh_available_event(self):
+        """Set or clear the availability event to match the services' state (lock held)."""
+        event = self._get_available_event()
+        if any(self._can_accept(service) for service in self.services):
+            event.set()
+        else:
+            event.clear()
+    
+    def _fire_expiries(self):
+        """Return services whose cooldown has ended to AVAILABLE and wake waiters."""
+        heap = self._cooldown_heap
+        now = time.monotonic()
+        expired = False
+        while heap and heap[0][0] <= now:
+            cooldown_until, _, service = heapq.heappop(heap)
+            # Skip stale entries for services that changed status since
+            if service.status == ServiceStatus.COOLDOWN and service.cooldown_until == cooldown_until:
+                service.status = ServiceStatus.AVAILABLE
+                expired = True
+        if expired:
+            self._get_available_event().set()
+        elif heap:
+            # Timer fired early; try again at the next expiry
+            asyncio.get_running_loop().call_later(heap[0][0] - now, self._fire_expiries)
+    
+    def _next_available_at(self) -> Optional[float]:
+        """Earliest pending cooldown expiry (time.monotonic), or None; may be a stale entry."""
+        return self._cooldown_heap[0][0] if self._cooldown_heap else None
+    
     async def get_available_service(self) -> Optional[ServiceInfo]:
         """
-        Get an available service for processing.
+        Get the least-loaded service that can take a batch.
+        
+        Services with fewer batches in flight win; ties go to the lowest
+        observed batch latency.
         
         Returns:
             Available ServiceInfo or None if all services are busy
         """
-        async with self.lock:
-            # Check all services and update their status
-            for service in self.services:
-                if service.is_available():
-                    return service
-            
-            # Check if any service is in cooldown and will be available soon
-            available_soon = None
-            min_wait_time = float('inf')
-            
-            for service in self.services:
-                if service.status == ServiceStatus.COOLDOWN:
-                    wait_time = service.cooldown_until - time.time()
-                    if wait_time < min_wait_time:
-                        min_wait_time = wait_time
-                        available_soon = service
-            
-            return None  # All services busy
+        # No lock: the scan never awaits, so it can't interleave with the
+        # mark_* writers on the event loop
+        best = None
+        best_position = 0
+        best_load = (0, 0.0)
+        for position, service in enumerate(self._rr):
+            if not self._can_accept(service):
+                continue
+            load = (service.in_flight, self.latency_ewma.get(service.endpoint, 0.0))
+            if best is None or load < best_load:
+                best = service
+                best_position = position
+                best_load = load
+        if best is not None:
+            self._rr.rotate(-(best_position + 1))
+            return best
+        
+        # All services busy; waiters sleep until a status change sets this
+        self._get_available_event().clear()
+        return None
     
     async def mark_service_processing(self, service: ServiceInfo):
         """Mark a service as processing a batch."""
         async with self.lock:
             service.status = ServiceStatus.PROCESSING
-            service.last_batch_time = time.time()
+            service.last_batch_time = time.monotonic()
+            service.in_flight += 1
+            self._refresh_available_event()
+    
+    async def mark_service_done(self, service: ServiceInfo):
+        """Record that one of the service's in-flight batches has finished."""
+        async with self.lock:
+            service.in_flight = max(0, service.in_flight - 1)
+            self._refresh_available_event()
     
     async def mark_service_cooldown(self, service: ServiceInfo):
-        """Mark a service as in cooldown after completing a batch."""
+        """
+        Mark a service as in cooldown after completing a batch.
+        
+        The cooldown window is measured from when the batch started, so the
+        time spent rendering counts toward it instead of being added on top.
+        """
         async with self.lock:
             service.status = ServiceStatus.COOLDOWN
-            service.cooldown_until = time.time() + self.cooldown_seconds
+            service.cooldown_until = service.last_batch_time + self.cooldown_seconds
             logger.debug(f"Service {service.endpoint} entering {self.cooldown_seconds}s cooldown")
+            self._refresh_available_event()
+            # One-shot timer ends the cooldown at its expiry
+            heapq.heappush(
+                self._cooldown_heap,
+                (service.cooldown_until, next(self._cooldown_seq), service)
+            )
+            asyncio.get_running_loop().call_later(
+                max(0.0, service.cooldown_until - time.monotonic()),
+                self._fire_expiries
+            )
+    
+    async def record_latency(self, service: ServiceInfo, elapsed: float):
+        """Fold a completed batch's round-trip time into the service's latency EWMA."""
+        async with self.lock:
+            previous = self.latency_ewma.get(service.endpoint)
+            if previous is None:
+                self.latency_ewma[service.endpoint] = elapsed
+            else:
+                self.latency_ewma[service.endpoint] = (
+                    self.latency_alpha * elapsed + (1 - self.latency_alpha) * previous
+                )
+    
+    async def record_batch_outcome(
+        self,
+        service: ServiceInfo,
+        batch_len: int,
+        elapsed: float,
+        succeeded: bool,
+        timeout: float
+    ):
+        """
+        Adapt the service's batch size to how its last batch went.
+        
+        A full batch that succeeded in under half the timeout doubles the size
+        (capped at twice the configured batch_size); a failed or timed-out
+        batch halves it.
+        """
+        async with self.lock:
+            if not succeeded:
+                new_size = max(1, service.batch_size // 2)
+            elif batch_len >= service.batch_size and elapsed < timeout / 2:
+                new_size = min(self.max_batch_size, service.batch_size * 2)
+            else:
+                return
+            if new_size != service.batch_size:
+                logger.debug(f"Service {service.endpoint} batch size {service.batch_size} -> {new_size}")
+                service.batch_size = new_size
     
     async def mark_service_failed(self, service: ServiceInfo):
         """Mark a service as failed and increment failure count."""
@@ -116,6 +245,7 @@ class ServicePoolManager:
             service.failure_count += 1
             service.status = ServiceStatus.FAILED
             logger.warning(f"Service {service.endpoint} marked as failed (failure count: {service.failure_count})")
+            self._refresh_available_event()
     
     async def mark_service_available(self, service: ServiceInfo):
         """Mark a service as available again (after recovery)."""
@@ -126,6 +256,7 @@ class ServicePoolManager:
                 logger.info(f"Service {service.endpoint} recovered and available")
             else:
                 logger.warning(f"Service {service.endpoint} has too many failures, keeping as failed")
+            self._refresh_available_event()
     
     async def get_all_available_services(self) -> List[ServiceInfo]:
         """
@@ -134,36 +265,45 @@ class ServicePoolManager:
         Returns:
             List of available services
         """
-        async with self.lock:
-            available = []
-            for service in self.services:
-                if service.is_available():
-                    available.append(service)
-            return available
+        return [service for service in self.services if service.is_available()]
     
     async def wait_for_available_service(self, timeout: Optional[float] = None) -> Optional[ServiceInfo]:
         """
         Wait for a service to become available.
         
+        Sleeps on the availability event instead of polling; it is set when a
+        service is marked available or a cooldown expires.
+        
         Args:
             timeout: Maximum time to wait in seconds
             
         Returns:
             Available service or None if timeout
         """
-        start_time = time.time()
+        event = self._get_available_event()
+        deadline = time.monotonic() + timeout if timeout else None
         
         while True:
             service = await self.get_available_service()
             if service:
                 return service
             
-            # Check timeout
-            if timeout and (time.time() - start_time) >= timeout:
-                return None
+            if logger.isEnabledFor(logging.DEBUG):
+                next_at = self._next_available_at()
+                if next_at is not None:
+                    logger.debug("All services busy; next cooldown ends in %.1fs", next_at - time.monotonic())
             
-            # Wait a bit before checking again
-            await asyncio.sleep(0.5)
+            # Re-check after every wakeup; another waiter may have taken the service
+            try:
+                if deadline is None:
+                    await event.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    await asyncio.wait_for(event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
     
     def get_service_count(self) -> int:
         """Get total number of services in pool."""
@@ -171,23 +311,6 @@ class ServicePoolManager:
     
     async def get_status_summary(self) -> Dict[str, int]:
         """Get summary of service statuses."""
-        async with self.lock:
-            summary = {
-                "available": 0,
-                "processing": 0,
-                "cooldown": 0,
-                "failed": 0
-            }
-            
-            for service in self.services:
-                if service.is_available():
-                    summary["available"] += 1
-                elif service.status == ServiceStatus.PROCESSING:
-                    summary["processing"] += 1
-                elif service.status == ServiceStatus.COOLDOWN:
-                    summary["cooldown"] += 1
-                elif service.status == ServiceStatus.FAILED:
-                    summary["failed"] += 1
-            
-            return summary
+        counts = Counter(service.status for service in self.services)
+        return {status.value: counts[status] for status in ServiceStatus}
 
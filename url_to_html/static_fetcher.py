@@ -3,13 +3,94 @@ Static HTTP fetch implementation.
 """
 
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
 from typing import Optional, Dict, Any, Tuple
-from .exceptions import BlockedError, TimeoutError, InvalidURLError
+from .exceptions import BlockedError, TimeoutError, InvalidURLError, ResponseTooLargeError
 
 logger = logging.getLogger(__name__)
 
 
+# Response bodies are streamed in chunks of this size up to the fetcher's max_bytes
+_READ_CHUNK_SIZE = 64 * 1024
+
+# Share of U+FFFD characters a utf-8 decode of an undeclared body may contain
+# before its charset is detected instead
+_MAX_REPLACEMENT_RATIO = 0.001
+
+
+def declared_encoding(response: requests.Response) -> Optional[str]:
+    """
+    Return the charset the server declared for a response, or None.
+    
+    requests reports ISO-8859-1 for any text/* response without a charset;
+    that default is treated as undeclared.
+    """
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding
+    return None
+
+
+def read_capped(
+    response: requests.Response,
+    max_bytes: int,
+    cancelled: Optional[threading.Event] = None
+) -> Optional[bytes]:
+    """
+    Read a streamed response body, giving up once it exceeds max_bytes.
+    
+    If cancelled is given and gets set while reading, the response is closed
+    and None is returned instead of the rest of the body being downloaded.
+    
+    Raises:
+        ResponseTooLargeError: If the body is larger than max_bytes
+    """
+    url = response.url
+    declared_length = response.headers.get('Content-Length')
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        response.close()
+        raise ResponseTooLargeError(
+            f"Response declares {declared_length} bytes", url=url, max_bytes=max_bytes
+        )
+    
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(_READ_CHUNK_SIZE):
+        if cancelled is not None and cancelled.is_set():
+            response.close()
+            return None
+        size += len(chunk)
+        if size > max_bytes:
+            response.close()
+            raise ResponseTooLargeError(
+                f"Response exceeded {max_bytes} bytes", url=url, max_bytes=max_bytes
+            )
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def decode_content(content: bytes, encoding: Optional[str]) -> str:
+    """
+    Decode a response body.
+    
+    Undeclared bodies (encoding None) are read as utf-8; charset detection
+    over the whole body only runs when that decode is mostly replacement
+    characters.
+    """
+    if encoding is None:
+        text = str(content, 'utf-8', errors='replace')
+        if text.count('\ufffd') <= len(text) * _MAX_REPLACEMENT_RATIO:
+            return text
+        encoding = chardet.detect(content)['encoding']
+    try:
+        return str(content, encoding or 'utf-8', errors='replace')
+    except (LookupError, TypeError):
+        # Unknown encoding name, fall back to utf-8
+        return str(content, errors='replace')
+
+
 class StaticFetcher:
     """Fetches HTML content using direct HTTP GET requests."""
     
@@ -17,7 +98,8 @@ class StaticFetcher:
         self,
         timeout: int = 30,
         headers: Optional[Dict[str, str]] = None,
-        allow_redirects: bool = True
+        allow_redirects: bool = True,
+        max_bytes: int = 10_000_000
     ):
         """
         Initialize the static fetcher.
@@ -26,6 +108,7 @@ class StaticFetcher:
             timeout: Request timeout in seconds
             headers: Custom headers to include in requests
             allow_redirects: Whether to follow redirects
+            max_bytes: Largest response body to accept (default: 10 MB)
         """
         self.timeout = timeout
         self.default_headers = {
@@ -39,6 +122,17 @@ class StaticFetcher:
         if headers:
             self.default_headers.update(headers)
         self.allow_redirects = allow_redirects
+        self.max_bytes = max_bytes
+        # One session per fetcher keeps TCP/TLS connections alive across fetches
+        self.session = requests.Session()
+        self.session.headers.update(self.default_headers)
+        adapter = HTTPAdapter(pool_maxsize=100)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def close(self):
+        """Close the fetcher's pooled connections."""
+        self.session.close()
     
     def fetch(self, url: str) -> Tuple[Optional[str], int]:
         """
@@ -54,28 +148,47 @@ class StaticFetcher:
             InvalidURLError: If URL is invalid
             TimeoutError: If request times out
         """
+        content, encoding, status_code = self.fetch_bytes(url)
+        if content is None:
+            return None, status_code
+        return decode_content(content, encoding), status_code
+    
+    def fetch_bytes(self, url: str) -> Tuple[Optional[bytes], Optional[str], int]:
+        """
+        Fetch the raw response body from URL without decoding it.
+        
+        Lets callers save and analyze the bytes directly and only decode the
+        page they end up returning (see decode_content).
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            Tuple of (content: Optional[bytes], encoding: Optional[str], status_code: int);
+            encoding is None when the server declared no charset
+            
+        Raises:
+            InvalidURLError: If URL is invalid
+            TimeoutError: If request times out
+            ResponseTooLargeError: If the body exceeds max_bytes
+        """
         try:
             logger.info(f"Attempting static fetch for: {url}")
-            response = requests.get(
+            response = self.session.get(
                 url,
-                headers=self.default_headers,
                 timeout=self.timeout,
-                allow_redirects=self.allow_redirects
+                allow_redirects=self.allow_redirects,
+                stream=True
             )
             
             status_code = response.status_code
             logger.debug(f"Static fetch status code: {status_code}")
             
-            # Try to decode content
-            try:
-                content = response.text
-            except UnicodeDecodeError:
-                # Try with different encoding
-                response.encoding = response.apparent_encoding or 'utf-8'
-                content = response.text
+            content = read_capped(response, self.max_bytes)
+            encoding = declared_encoding(response)
             
             logger.info(f"Static fetch successful: {len(content)} bytes, status {status_code}")
-            return content, status_code
+            return content, encoding, status_code
             
         except requests.exceptions.Timeout:
             logger.warning(f"Static fetch timeout for: {url}")
@@ -89,5 +202,5 @@ class StaticFetcher:
             logger.warning(f"Static fetch failed for {url}: {e}")
             # Return None to indicate failure, but don't raise exception
             # Let the fallback mechanism handle it
-            return None, 0
+            return None, None, 0
 
@@ -3,20 +3,61 @@ XHR/API fetch implementation for alternative endpoints.
 """
 
 import logging
+import threading
 import requests
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
 from typing import Optional, Dict, List, Tuple
+from .static_fetcher import declared_encoding, decode_content, read_capped
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _api_endpoints(scheme: str, netloc: str, path: str, query: str) -> Tuple[str, ...]:
+    """
+    Build the candidate API endpoints for one URL.
+    
+    Cached per URL component tuple; plain string formatting replaces urljoin
+    since every pattern is an absolute path on the same host. Duplicates
+    (e.g. '/api' and '/data' twice for a bare domain) are dropped in order.
+    """
+    base_url = f"{scheme}://{netloc}"
+    path = path.rstrip('/')
+    
+    # Each candidate is formatted in one step instead of building the
+    # pattern string first and prefixing the base URL to it
+    endpoints = [
+        f"{base_url}/api{path}",
+        f"{base_url}/api/v1{path}",
+        f"{base_url}/api/v2{path}",
+        f"{base_url}/api/data{path}",
+        f"{base_url}{path}/data",
+        f"{base_url}{path}/api",
+        f"{base_url}/data{path}",
+    ]
+    
+    if path:
+        endpoints.append(f"{base_url}{path}.json")
+    
+    if query:
+        # The first three patterns again, with the query string preserved
+        endpoints += [f"{endpoint}?{query}" for endpoint in endpoints[:3]]
+    
+    return tuple(dict.fromkeys(endpoints))
+
+
 class XHRFetcher:
     """Attempts to fetch content via XHR/API endpoints."""
     
     def __init__(
         self,
         timeout: int = 30,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        max_bytes: int = 10_000_000,
+        max_candidates: int = 5
     ):
         """
         Initialize the XHR fetcher.
@@ -24,8 +65,12 @@ class XHRFetcher:
         Args:
             timeout: Request timeout in seconds
             headers: Custom headers to include in requests
+            max_bytes: Largest response body to accept; larger ones are skipped (default: 10 MB)
+            max_candidates: Most generated API endpoints to try per URL (default: 5)
         """
         self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_candidates = max_candidates
         self.default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json, text/html, */*',
@@ -35,6 +80,19 @@ class XHRFetcher:
         }
         if headers:
             self.default_headers.update(headers)
+        # One session per fetcher keeps TCP/TLS connections alive across fetches
+        self.session = requests.Session()
+        self.session.headers.update(self.default_headers)
+        adapter = HTTPAdapter(pool_maxsize=100)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Probes the generated API endpoints in parallel over the shared session
+        self._probe_pool = ThreadPoolExecutor(max_workers=12, thread_name_prefix="url_to_html-xhr")
+    
+    def close(self):
+        """Close the fetcher's pooled connections and probe threads."""
+        self._probe_pool.shutdown(wait=False)
+        self.session.close()
     
     def _generate_api_endpoints(self, url: str) -> List[str]:
         """
@@ -47,35 +105,46 @@ class XHRFetcher:
             List of potential API endpoint URLs
         """
         parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-        path = parsed.path.rstrip('/')
-        
-        endpoints = []
-        
-        # Common API patterns
-        api_patterns = [
-            '/api' + path,
-            '/api/v1' + path,
-            '/api/v2' + path,
-            '/api/data' + path,
-            path + '/data',
-            path + '/api',
-            '/data' + path,
-        ]
-        
-        for pattern in api_patterns:
-            endpoints.append(urljoin(base_url, pattern))
-        
-        # Try JSON endpoint
-        if path:
-            endpoints.append(urljoin(base_url, path + '.json'))
-        
-        # Try with query parameters preserved
-        if parsed.query:
-            for pattern in api_patterns[:3]:  # Limit to avoid too many URLs
-                endpoints.append(urljoin(base_url, pattern + '?' + parsed.query))
+        endpoints = _api_endpoints(parsed.scheme, parsed.netloc, parsed.path, parsed.query)
+        return list(endpoints[:self.max_candidates])
+    
+    def _try_endpoint(
+        self,
+        endpoint: str,
+        headers: Dict[str, str],
+        done: threading.Event
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Fetch one API endpoint; returns (content, status) or None if unusable.
         
-        return endpoints
+        Once done is set (another probe won), the body is not downloaded.
+        """
+        try:
+            logger.debug(f"Trying XHR endpoint: {endpoint}")
+            # Streamed so error pages are dropped without downloading the body
+            response = self.session.get(
+                endpoint,
+                headers=headers,
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True
+            )
+            
+            if response.status_code != 200 or done.is_set():
+                response.close()
+                return None
+            body = read_capped(response, self.max_bytes, done)
+            if body is not None:
+                content = decode_content(body, declared_encoding(response))
+                # JSON responses are returned as text (could be enhanced to parse JSON)
+                if response.headers.get('Content-Type', '').startswith('application/json'):
+                    logger.info(f"XHR fetch successful (JSON endpoint): {len(content)} bytes")
+                else:
+                    logger.info(f"XHR fetch successful (endpoint): {len(content)} bytes")
+                return content, response.status_code
+        except Exception as e:
+            logger.debug(f"XHR fetch failed for endpoint {endpoint}: {e}")
+        return None
     
     def fetch(self, url: str) -> Tuple[Optional[str], int]:
         """
@@ -89,67 +158,51 @@ class XHRFetcher:
         """
         logger.info(f"Attempting XHR fetch for: {url}")
         
-        # Set referer to original URL
-        headers = self.default_headers.copy()
-        headers['Referer'] = url
+        # Set referer to original URL (other headers live on the session)
+        headers = {'Referer': url}
         
         # First, try the original URL with XHR headers
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
                 headers=headers,
                 timeout=self.timeout,
-                allow_redirects=True
+                allow_redirects=True,
+                stream=True
             )
             
-            if response.status_code == 200:
-                try:
-                    content = response.text
-                    logger.info(f"XHR fetch successful (original URL): {len(content)} bytes")
-                    return content, response.status_code
-                except UnicodeDecodeError:
-                    response.encoding = response.apparent_encoding or 'utf-8'
-                    content = response.text
-                    logger.info(f"XHR fetch successful (original URL): {len(content)} bytes")
-                    return content, response.status_code
+            if response.status_code != 200:
+                response.close()
+            else:
+                content = decode_content(
+                    read_capped(response, self.max_bytes), declared_encoding(response)
+                )
+                logger.info(f"XHR fetch successful (original URL): {len(content)} bytes")
+                return content, response.status_code
         except Exception as e:
             logger.debug(f"XHR fetch failed for original URL: {e}")
         
-        # Try alternative API endpoints
+        # Try alternative API endpoints concurrently; the first one to
+        # succeed wins and the rest are cancelled
         api_endpoints = self._generate_api_endpoints(url)
         logger.debug(f"Trying {len(api_endpoints)} alternative endpoints")
         
-        for endpoint in api_endpoints:
-            try:
-                logger.debug(f"Trying XHR endpoint: {endpoint}")
-                response = requests.get(
-                    endpoint,
-                    headers=headers,
-                    timeout=self.timeout,
-                    allow_redirects=True
-                )
-                
-                if response.status_code == 200:
-                    try:
-                        content = response.text
-                        # If it's JSON, try to extract HTML or return as-is
-                        if response.headers.get('Content-Type', '').startswith('application/json'):
-                            # JSON response - might contain HTML or data
-                            # For now, return as text (could be enhanced to parse JSON)
-                            logger.info(f"XHR fetch successful (JSON endpoint): {len(content)} bytes")
-                            return content, response.status_code
-                        else:
-                            logger.info(f"XHR fetch successful (endpoint): {len(content)} bytes")
-                            return content, response.status_code
-                    except UnicodeDecodeError:
-                        response.encoding = response.apparent_encoding or 'utf-8'
-                        content = response.text
-                        logger.info(f"XHR fetch successful (endpoint): {len(content)} bytes")
-                        return content, response.status_code
-                        
-            except Exception as e:
-                logger.debug(f"XHR fetch failed for endpoint {endpoint}: {e}")
-                continue
+        done = threading.Event()
+        futures = [
+            self._probe_pool.submit(self._try_endpoint, endpoint, headers, done)
+            for endpoint in api_endpoints
+        ]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    return result
+        finally:
+            # Running probes stop before (or while) reading their body; queued
+            # ones never start
+            done.set()
+            for future in futures:
+                future.cancel()
         
         logger.warning(f"XHR fetch failed for all endpoints: {url}")
         return None, 0